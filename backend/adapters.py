@@ -6,24 +6,25 @@ Each vendor has its own raw data format. Adapters convert to UnifiedRobotState.
 from __future__ import annotations
 
 import math
-from datetime import datetime
-from typing import Any
-
-from models import (
-    ActivityEntry,
-    ErrorInfo,
-    Position,
-    RobotStatus,
-    Task,
-    TaskStatus,
-    TaskType,
-    UnifiedRobotState,
-)
+import time
+from typing import Any, Iterable
+
+from models import RobotStatus, UnifiedRobotState
 from facility import get_zone_for_position
 
+# Shared default for trail/activity lookups. raw.get(key, []) builds a new
+# empty list on every call, hit or miss — twice per robot per tick.
+_EMPTY: tuple = ()
+
 
 class BaseAdapter:
-    """Base class for vendor adapters."""
+    """
+    Base class for vendor adapters.
+
+    Adapters translate raw telemetry into a plain nested dict and validate it
+    once with UnifiedRobotState.model_validate(), instead of constructing (and
+    validating) every nested Position/Task/ActivityEntry individually.
+    """
 
     vendor_name: str = ""
     model_name: str = ""
@@ -31,6 +32,32 @@ class BaseAdapter:
     def normalize(self, raw: dict[str, Any]) -> UnifiedRobotState:
         raise NotImplementedError
 
+    @staticmethod
+    def _error_payload(e: dict[str, Any] | None) -> dict[str, Any] | None:
+        """Map the shared raw error dict onto ErrorInfo fields."""
+        if not e:
+            return None
+        return {
+            "error_code": e["error_code"],
+            "vendor_code": e["error_code"],
+            "name": e.get("name", "Unknown"),
+            "description": e.get("description", ""),
+            "timestamp": e["timestamp"],
+            "resolved": e.get("resolved", False),
+        }
+
+    @staticmethod
+    def _activity_payload(entries: Iterable[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Map the shared raw activity log onto ActivityEntry fields."""
+        return [
+            {
+                "timestamp": a["timestamp"],
+                "description": a["description"],
+                "activity_type": a["type"],
+            }
+            for a in entries
+        ]
+
 
 class AmazonRoboticsAdapter(BaseAdapter):
     """
@@ -55,61 +82,28 @@ class AmazonRoboticsAdapter(BaseAdapter):
     }
 
     def normalize(self, raw: dict[str, Any]) -> UnifiedRobotState:
-        pos = Position(x=raw["position"]["x"], y=raw["position"]["y"])
+        pos = {"x": raw["position"]["x"], "y": raw["position"]["y"]}
         status = self.STATUS_MAP.get(raw.get("status_code", 0), RobotStatus.IDLE)
 
-        current_task = None
-        if raw.get("task"):
-            t = raw["task"]
-            current_task = Task(
-                task_id=t["task_id"],
-                task_type=TaskType(t.get("task_type", "transport")),
-                from_station=t["from_station"],
-                to_station=t["to_station"],
-                status=TaskStatus(t.get("status", "in_progress")),
-                started_at=t["started_at"],
-                eta_seconds=t.get("eta_seconds"),
-            )
-
-        last_error = None
-        if raw.get("last_error"):
-            e = raw["last_error"]
-            last_error = ErrorInfo(
-                error_code=e["error_code"],
-                vendor_code=e["error_code"],
-                name=e.get("name", "Unknown"),
-                description=e.get("description", ""),
-                timestamp=e["timestamp"],
-                resolved=e.get("resolved", False),
-            )
-
-        trail = [Position(x=p["x"], y=p["y"]) for p in raw.get("trail", [])]
-        activity = [
-            ActivityEntry(
-                timestamp=a["timestamp"],
-                description=a["description"],
-                activity_type=a["type"],
-            )
-            for a in raw.get("activity", [])
-        ]
-
-        return UnifiedRobotState(
-            id=raw["robot_id"],
-            name=raw["robot_id"],
-            vendor=self.vendor_name,
-            model=self.model_name,
-            position=pos,
-            heading=raw.get("heading", 0.0),
-            speed=raw.get("speed", 0.0),
-            status=status,
-            battery=raw.get("battery", 100.0),
-            current_task=current_task,
-            recent_activity=activity,
-            last_error=last_error,
-            trail=trail,
-            zone=get_zone_for_position(pos.x, pos.y),
-            last_updated=datetime.now(),
-        )
+        trail = [{"x": p["x"], "y": p["y"]} for p in raw.get("trail", _EMPTY)]
+
+        return UnifiedRobotState.model_validate({
+            "id": raw["robot_id"],
+            "name": raw["robot_id"],
+            "vendor": self.vendor_name,
+            "model": self.model_name,
+            "position": pos,
+            "heading": raw.get("heading", 0.0),
+            "speed": raw.get("speed", 0.0),
+            "status": status,
+            "battery": raw.get("battery", 100.0),
+            "current_task": raw.get("task") or None,
+            "recent_activity": self._activity_payload(raw.get("activity", _EMPTY)),
+            "last_error": self._error_payload(raw.get("last_error")),
+            "trail": trail,
+            "zone": get_zone_for_position(pos["x"], pos["y"]),
+            "last_updated": time.time(),
+        })
 
 
 class BalyoAdapter(BaseAdapter):
@@ -138,67 +132,34 @@ class BalyoAdapter(BaseAdapter):
         # Locus uses lat/lng as grid-fraction coordinates: convert to actual grid
         from facility import GRID_WIDTH, GRID_HEIGHT
         raw_pos = raw["position"]
-        pos = Position(
-            x=raw_pos["lat"] * GRID_WIDTH,
-            y=raw_pos["lng"] * GRID_HEIGHT,
-        )
+        pos = {
+            "x": raw_pos["lat"] * GRID_WIDTH,
+            "y": raw_pos["lng"] * GRID_HEIGHT,
+        }
         status = self.STATUS_MAP.get(raw.get("status_str", "IDLE"), RobotStatus.IDLE)
 
-        current_task = None
-        if raw.get("task"):
-            t = raw["task"]
-            current_task = Task(
-                task_id=t["task_id"],
-                task_type=TaskType(t.get("task_type", "transport")),
-                from_station=t["from_station"],
-                to_station=t["to_station"],
-                status=TaskStatus(t.get("status", "in_progress")),
-                started_at=t["started_at"],
-                eta_seconds=t.get("eta_seconds"),
-            )
-
-        last_error = None
-        if raw.get("last_error"):
-            e = raw["last_error"]
-            last_error = ErrorInfo(
-                error_code=e["error_code"],
-                vendor_code=e["error_code"],
-                name=e.get("name", "Unknown"),
-                description=e.get("description", ""),
-                timestamp=e["timestamp"],
-                resolved=e.get("resolved", False),
-            )
-
         trail = [
-            Position(x=p["lat"] * GRID_WIDTH, y=p["lng"] * GRID_HEIGHT)
-            for p in raw.get("trail", [])
-        ]
-        activity = [
-            ActivityEntry(
-                timestamp=a["timestamp"],
-                description=a["description"],
-                activity_type=a["type"],
-            )
-            for a in raw.get("activity", [])
+            {"x": p["lat"] * GRID_WIDTH, "y": p["lng"] * GRID_HEIGHT}
+            for p in raw.get("trail", _EMPTY)
         ]
 
-        return UnifiedRobotState(
-            id=raw["robot_id"],
-            name=raw["robot_id"],
-            vendor=self.vendor_name,
-            model=self.model_name,
-            position=pos,
-            heading=raw.get("orientation_deg", 0.0),
-            speed=raw.get("velocity_mps", 0.0),
-            status=status,
-            battery=raw.get("battery_pct", 100.0),
-            current_task=current_task,
-            recent_activity=activity,
-            last_error=last_error,
-            trail=trail,
-            zone=get_zone_for_position(pos.x, pos.y),
-            last_updated=datetime.now(),
-        )
+        return UnifiedRobotState.model_validate({
+            "id": raw["robot_id"],
+            "name": raw["robot_id"],
+            "vendor": self.vendor_name,
+            "model": self.model_name,
+            "position": pos,
+            "heading": raw.get("orientation_deg", 0.0),
+            "speed": raw.get("velocity_mps", 0.0),
+            "status": status,
+            "battery": raw.get("battery_pct", 100.0),
+            "current_task": raw.get("task") or None,
+            "recent_activity": self._activity_payload(raw.get("activity", _EMPTY)),
+            "last_error": self._error_payload(raw.get("last_error")),
+            "trail": trail,
+            "zone": get_zone_for_position(pos["x"], pos["y"]),
+            "last_updated": time.time(),
+        })
 
 
 class AmazonInternalAdapter(BaseAdapter):
@@ -226,61 +187,28 @@ class AmazonInternalAdapter(BaseAdapter):
 
     def normalize(self, raw: dict[str, Any]) -> UnifiedRobotState:
         raw_pos = raw["position"]  # [row, col]
-        pos = Position(x=float(raw_pos[1]), y=float(raw_pos[0]))
+        pos = {"x": float(raw_pos[1]), "y": float(raw_pos[0])}
         status = self.STATUS_MAP.get(raw.get("status_de", "Bereit"), RobotStatus.IDLE)
 
-        current_task = None
-        if raw.get("task"):
-            t = raw["task"]
-            current_task = Task(
-                task_id=t["task_id"],
-                task_type=TaskType(t.get("task_type", "transport")),
-                from_station=t["from_station"],
-                to_station=t["to_station"],
-                status=TaskStatus(t.get("status", "in_progress")),
-                started_at=t["started_at"],
-                eta_seconds=t.get("eta_seconds"),
-            )
-
-        last_error = None
-        if raw.get("last_error"):
-            e = raw["last_error"]
-            last_error = ErrorInfo(
-                error_code=e["error_code"],
-                vendor_code=e["error_code"],
-                name=e.get("name", "Unknown"),
-                description=e.get("description", ""),
-                timestamp=e["timestamp"],
-                resolved=e.get("resolved", False),
-            )
-
-        trail = [Position(x=float(p[1]), y=float(p[0])) for p in raw.get("trail", [])]
-        activity = [
-            ActivityEntry(
-                timestamp=a["timestamp"],
-                description=a["description"],
-                activity_type=a["type"],
-            )
-            for a in raw.get("activity", [])
-        ]
-
-        return UnifiedRobotState(
-            id=raw["robot_id"],
-            name=raw["robot_id"],
-            vendor=self.vendor_name,
-            model=self.model_name,
-            position=pos,
-            heading=raw.get("richtung", 0.0),
-            speed=raw.get("geschwindigkeit", 0.0),
-            status=status,
-            battery=raw.get("batterie", 100.0),
-            current_task=current_task,
-            recent_activity=activity,
-            last_error=last_error,
-            trail=trail,
-            zone=get_zone_for_position(pos.x, pos.y),
-            last_updated=datetime.now(),
-        )
+        trail = [{"x": float(p[1]), "y": float(p[0])} for p in raw.get("trail", _EMPTY)]
+
+        return UnifiedRobotState.model_validate({
+            "id": raw["robot_id"],
+            "name": raw["robot_id"],
+            "vendor": self.vendor_name,
+            "model": self.model_name,
+            "position": pos,
+            "heading": raw.get("richtung", 0.0),
+            "speed": raw.get("geschwindigkeit", 0.0),
+            "status": status,
+            "battery": raw.get("batterie", 100.0),
+            "current_task": raw.get("task") or None,
+            "recent_activity": self._activity_payload(raw.get("activity", _EMPTY)),
+            "last_error": self._error_payload(raw.get("last_error")),
+            "trail": trail,
+            "zone": get_zone_for_position(pos["x"], pos["y"]),
+            "last_updated": time.time(),
+        })
 
 
 # Adapter registry
@@ -63,12 +63,11 @@ class AnalyticsEngine:
         # Top errors
         error_counter: Counter = Counter()
         for r in robots:
-            for err in r.error_history:
-                error_counter[f"{err['error_code']}|{err['name']}"] += 1
+            error_counter.update(r.error_counts_by_code)
 
         top_errors = [
-            {"code": key.split("|")[0], "name": key.split("|")[1], "count": count}
-            for key, count in error_counter.most_common(5)
+            {"code": code, "name": name, "count": count}
+            for (code, name), count in error_counter.most_common(5)
         ]
 
         return DailySummary(
@@ -86,17 +85,8 @@ class AnalyticsEngine:
 
     def get_vendor_comparison(self) -> list[VendorMetrics]:
         """Compare performance metrics across vendors."""
-        vendor_groups: dict[str, list] = {
-            "Amazon Normal": [],
-            "Balyo": [],
-            "Amazon Internal": [],
-        }
-
-        for r in self.simulator.robots.values():
-            vendor_groups[r.vendor].append(r)
-
         results = []
-        for vendor, robots in vendor_groups.items():
+        for vendor, robots in self.simulator.robots_by_vendor.items():
             if not robots:
                 continue
 
@@ -109,7 +99,7 @@ class AnalyticsEngine:
                 all_times.extend(r.task_times)
             avg_task_time = (sum(all_times) / len(all_times) / 60.0) if all_times else 0.0
 
-            total_errors = sum(len(r.error_history) for r in robots)
+            total_errors = sum(r.error_count for r in robots)
             error_rate = (total_errors / total_tasks * 100) if total_tasks > 0 else 0.0
 
             total_time = self.simulator.tick_count * 0.5
@@ -142,7 +132,7 @@ class AnalyticsEngine:
         # Find top performer and worst performer thresholds
         task_counts = [r.tasks_completed for r in robots]
         max_tasks = max(task_counts) if task_counts else 0
-        error_counts = [len(r.error_history) for r in robots]
+        error_counts = [r.error_count for r in robots]
 
         for r in robots:
             all_times = r.task_times
@@ -151,7 +141,7 @@ class AnalyticsEngine:
             total_time = self.simulator.tick_count * 0.5
             uptime = max(0, (total_time - r.total_error_time - r.total_charge_time) / max(total_time, 1) * 100)
 
-            err_count = len(r.error_history)
+            err_count = r.error_count
 
             results.append(RobotPerformance(
                 robot_id=r.robot_id,
@@ -173,22 +163,16 @@ class AnalyticsEngine:
         results = []
         robots = list(self.simulator.robots.values())
 
-        for zone_name, bounds in ZONES.items():
-            # Count robots currently in this zone
-            zone_robots = [
-                r for r in robots
-                if bounds["x_min"] <= r.x <= bounds["x_max"]
-                and bounds["y_min"] <= r.y <= bounds["y_max"]
-            ]
+        # Bucket robots and their error counts by zone in a single pass instead of
+        # testing every zone rectangle against every robot.
+        zone_robots_by_name: dict[str, list] = {zone_name: [] for zone_name in ZONES}
+        zone_error_counts: Counter = Counter()
+        for r in robots:
+            zone_robots_by_name.get(get_zone_for_position(r.x, r.y), []).append(r)
+            zone_error_counts.update(r.error_counts_by_zone)
 
-            # Count tasks and errors that occurred in this zone (from error history)
-            zone_errors = 0
-            for r in robots:
-                for err in r.error_history:
-                    pos = err.get("position", {})
-                    if (bounds["x_min"] <= pos.get("x", -1) <= bounds["x_max"]
-                            and bounds["y_min"] <= pos.get("y", -1) <= bounds["y_max"]):
-                        zone_errors += 1
+        for zone_name, zone_robots in zone_robots_by_name.items():
+            zone_errors = zone_error_counts[zone_name]
 
             # Simulated task count based on robot presence
             task_count = sum(r.tasks_completed for r in zone_robots)
@@ -11,12 +11,13 @@ Continuously monitors robot positions and states to detect:
 from __future__ import annotations
 
 import math
-from datetime import datetime
+import time
 from typing import Optional
 
 from models import (
     Alert,
     AlertSeverity,
+    AlertState,
     AlertType,
     Position,
     RobotStatus,
@@ -42,7 +43,7 @@ class ConflictEngine:
     def __init__(self, simulator: FleetSimulator):
         self.simulator = simulator
         self.active_alerts: dict[str, Alert] = {}  # key = alert fingerprint
-        self._alert_cooldowns: dict[str, datetime] = {}  # prevent spam
+        self._alert_cooldowns: dict[str, float] = {}  # prevent spam
 
     def check_all(self) -> list[Alert]:
         """Run all conflict checks. Returns new alerts generated."""
@@ -70,7 +71,7 @@ class ConflictEngine:
                 if len([a for a in self.active_alerts.values() if not a.resolved]) >= self.MAX_ACTIVE_ALERTS:
                     self._evict_oldest()
                 self.active_alerts[fp] = alert
-                self._alert_cooldowns[fp] = datetime.now()
+                self._alert_cooldowns[fp] = time.time()
 
         # Auto-resolve alerts whose condition is no longer detected
         self._auto_resolve_stale(current_fps)
@@ -95,16 +96,16 @@ class ConflictEngine:
     def acknowledge_alert(self, alert_id: str) -> bool:
         for alert in self.active_alerts.values():
             if alert.id == alert_id:
-                alert.acknowledged = True
-                alert.acknowledged_at = datetime.now()
+                alert.state |= AlertState.ACKNOWLEDGED
+                alert.acknowledged_at = time.time()
                 return True
         return False
 
     def resolve_alert(self, alert_id: str) -> bool:
         for fp, alert in list(self.active_alerts.items()):
             if alert.id == alert_id:
-                alert.resolved = True
-                alert.resolved_at = datetime.now()
+                alert.state |= AlertState.RESOLVED
+                alert.resolved_at = time.time()
                 alert.severity = AlertSeverity.RESOLVED
                 return True
         return False
@@ -119,19 +120,19 @@ class ConflictEngine:
         last_time = self._alert_cooldowns.get(fingerprint)
         if not last_time:
             return False
-        return (datetime.now() - last_time).total_seconds() < self.COOLDOWN_SECONDS
+        return time.time() - last_time < self.COOLDOWN_SECONDS
 
     def _auto_resolve_stale(self, current_fps: set[str]):
         """Auto-resolve alerts whose condition is no longer detected."""
-        now = datetime.now()
+        now = time.time()
         for fp, alert in list(self.active_alerts.items()):
             if alert.resolved:
                 continue
             # If the condition is no longer present and alert is old enough
             if fp not in current_fps:
-                age = (now - alert.created_at).total_seconds()
+                age = now - alert.created_at
                 if age > self.STALE_SECONDS:
-                    alert.resolved = True
+                    alert.state |= AlertState.RESOLVED
                     alert.resolved_at = now
                     alert.severity = AlertSeverity.RESOLVED
 
@@ -152,11 +153,11 @@ class ConflictEngine:
 
     def _cleanup_old_alerts(self):
         """Remove resolved alerts quickly."""
-        now = datetime.now()
+        now = time.time()
         to_remove = []
         for fp, alert in self.active_alerts.items():
             if alert.resolved and alert.resolved_at:
-                if (now - alert.resolved_at).total_seconds() > self.RESOLVED_TTL_SECONDS:
+                if now - alert.resolved_at > self.RESOLVED_TTL_SECONDS:
                     to_remove.append(fp)
         for fp in to_remove:
             del self.active_alerts[fp]
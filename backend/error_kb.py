@@ -699,6 +699,35 @@ ALL_ERRORS: list[ErrorCodeEntry] = AR_ERRORS + BALYO_ERRORS + AMZN_ERRORS
 
 # Index by code for fast lookup
 ERROR_BY_CODE: dict[str, ErrorCodeEntry] = {e.code: e for e in ALL_ERRORS}
+# Same table keyed by uppercased code, for codes typed in free text ("0x8001",
+# "nav_lost") where the caller can't know the vendor's casing
+_ERROR_BY_UPPER_CODE: dict[str, ErrorCodeEntry] = {e.code.upper(): e for e in ALL_ERRORS}
+
+# RCA documentation view of each entry; the KB is static, so these are built once
+_ERROR_DOC_BY_CODE: dict[str, dict] = {
+    e.code: {
+        "code": e.code,
+        "name": e.name,
+        "description": e.description,
+        "common_causes": e.common_causes,
+        "remediation_steps": e.remediation_steps,
+        "severity": e.severity.value,
+        "auto_recoverable": e.auto_recoverable,
+    }
+    for e in ALL_ERRORS
+}
+
+# Search index: each entry's searchable fields (code, name, vendor, keywords,
+# description), lowercased once and joined with a separator that can't appear
+# in a query, so a search is one substring test per entry.
+_SEARCH_SEP = "\x00"
+_SEARCH_INDEX: list[tuple[ErrorCodeEntry, str]] = [
+    (
+        e,
+        _SEARCH_SEP.join([e.code.lower(), e.name.lower(), e.vendor.lower(), *e.keywords, e.description.lower()]),
+    )
+    for e in ALL_ERRORS
+]
 
 # Cross-vendor mapping (similar error types across vendors)
 CROSS_VENDOR_MAP = {
@@ -717,32 +746,22 @@ def lookup_error(code: str) -> ErrorCodeEntry | None:
     return ERROR_BY_CODE.get(code)
 
 
+def lookup_error_doc(code: str) -> dict | None:
+    """Look up an error code by exact match, as the documentation dict used in RCA prompts."""
+    return _ERROR_DOC_BY_CODE.get(code)
+
+
+def find_error_code(word: str) -> ErrorCodeEntry | None:
+    """Look up an error code by exact match, ignoring case."""
+    return _ERROR_BY_UPPER_CODE.get(word.upper())
+
+
 def search_errors(query: str) -> list[ErrorCodeEntry]:
     """Search error codes by partial code match, keyword, vendor, or description."""
     query_lower = query.lower()
-    results = []
-    for entry in ALL_ERRORS:
-        # Check code match
-        if query_lower in entry.code.lower():
-            results.append(entry)
-            continue
-        # Check name match
-        if query_lower in entry.name.lower():
-            results.append(entry)
-            continue
-        # Check vendor match
-        if query_lower in entry.vendor.lower():
-            results.append(entry)
-            continue
-        # Check keyword match
-        if any(query_lower in kw for kw in entry.keywords):
-            results.append(entry)
-            continue
-        # Check description match
-        if query_lower in entry.description.lower():
-            results.append(entry)
-            continue
-    return results
+    if _SEARCH_SEP in query_lower:
+        return []
+    return [entry for entry, text in _SEARCH_INDEX if query_lower in text]
 
 
 def get_errors_by_vendor(vendor: str) -> list[ErrorCodeEntry]:
@@ -3,6 +3,8 @@ Facility layout definition for FleetBridge simulation.
 40x30 grid representing a warehouse floor with zones, stations, aisles, and charging areas.
 """
 
+from bisect import bisect_right
+
 from models import Position
 
 # Grid dimensions
@@ -71,12 +73,54 @@ PARKING_ZONES = {
 }
 
 
+# --- Zone lookup index ---
+# The zones tile the floor as a grid of non-overlapping column and row bands,
+# so a point is located by bisecting each axis once instead of testing every
+# zone rectangle. Points in the gaps between bands fall in no zone.
+_ZONE_COLS = sorted({(b["x_min"], b["x_max"]) for b in ZONES.values()})
+_ZONE_ROWS = sorted({(b["y_min"], b["y_max"]) for b in ZONES.values()})
+_ZONE_COL_STARTS = [lo for lo, _ in _ZONE_COLS]
+_ZONE_ROW_STARTS = [lo for lo, _ in _ZONE_ROWS]
+_ZONE_GRID: dict[tuple[int, int], str] = {
+    (_ZONE_COLS.index((b["x_min"], b["x_max"])), _ZONE_ROWS.index((b["y_min"], b["y_max"]))): name
+    for name, b in ZONES.items()
+}
+
+
+def _band_index(bands: list[tuple[int, int]], starts: list[int], v: float) -> int:
+    i = bisect_right(starts, v) - 1
+    if i >= 0 and v <= bands[i][1]:
+        return i
+    return -1
+
+
 def get_zone_for_position(x: float, y: float) -> str:
     """Determine which zone a position falls in."""
-    for zone_name, bounds in ZONES.items():
-        if bounds["x_min"] <= x <= bounds["x_max"] and bounds["y_min"] <= y <= bounds["y_max"]:
-            return zone_name
-    return "Unknown"
+    col = _band_index(_ZONE_COLS, _ZONE_COL_STARTS, x)
+    row = _band_index(_ZONE_ROWS, _ZONE_ROW_STARTS, y)
+    return _ZONE_GRID.get((col, row), "Unknown")
+
+
+# --- Zone landmarks ---
+# Zone centres and the station closest to each centre never change, so they are
+# worked out once here rather than every time an instruction names a zone.
+ZONE_CENTROIDS: dict[str, tuple[float, float]] = {
+    name: ((b["x_min"] + b["x_max"]) / 2, (b["y_min"] + b["y_max"]) / 2)
+    for name, b in ZONES.items()
+}
+ZONE_NEAREST_STATION: dict[str, str] = {
+    name: min(STATIONS, key=lambda s: (STATIONS[s].x - cx) ** 2 + (STATIONS[s].y - cy) ** 2)
+    for name, (cx, cy) in ZONE_CENTROIDS.items()
+}
+
+
+# --- Static snapshots ---
+# The layout never changes after import, so the per-tick helpers below walk
+# flat tuples instead of re-iterating the dicts.
+_STATION_NAMES: tuple[str, ...] = tuple(STATIONS)
+_CHARGING_POINTS: tuple[tuple[str, Position, float, float], ...] = tuple(
+    (name, pos, pos.x, pos.y) for name, pos in CHARGING_STATIONS.items()
+)
 
 
 def get_nearest_charging_station(x: float, y: float) -> tuple[str, Position, float]:
@@ -84,8 +128,8 @@ def get_nearest_charging_station(x: float, y: float) -> tuple[str, Position, flo
     best_name = ""
     best_pos = Position(x=0, y=0)
     best_dist = float("inf")
-    for name, pos in CHARGING_STATIONS.items():
-        dist = ((pos.x - x) ** 2 + (pos.y - y) ** 2) ** 0.5
+    for name, pos, px, py in _CHARGING_POINTS:
+        dist = ((px - x) ** 2 + (py - y) ** 2) ** 0.5
         if dist < best_dist:
             best_dist = dist
             best_pos = pos
@@ -101,10 +145,13 @@ def get_station_list() -> list[str]:
 def get_random_station_pair() -> tuple[str, str]:
     """Get two different random stations for task generation."""
     import random
-    names = list(STATIONS.keys())
-    from_st = random.choice(names)
-    to_st = random.choice([n for n in names if n != from_st])
-    return from_st, to_st
+    names = _STATION_NAMES
+    i = random.randrange(len(names))
+    # Same draw as choosing from the names without the 'from' station
+    j = random.randrange(len(names) - 1)
+    if j >= i:
+        j += 1
+    return names[i], names[j]
 
 
 def distance(p1: Position, p2: Position) -> float:
@@ -10,7 +10,7 @@ import asyncio
 import json
 import os
 from contextlib import asynccontextmanager
-from datetime import datetime
+import time
 from typing import Optional
 
 from pathlib import Path
@@ -19,7 +19,7 @@ from dotenv import load_dotenv
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, Response
 
 load_dotenv()
 
@@ -33,13 +33,16 @@ from models import (
     RobotPerformance,
     ZoneMetrics,
     FleetUpdate,
+    PoseUpdate,
     RobotStatus,
+    ROBOT_STATUS_BY_VALUE,
+    to_iso,
 )
 from simulator import FleetSimulator
 from conflict_engine import ConflictEngine
 from analytics_engine import AnalyticsEngine
 from rca_engine import RCAEngine
-from nl_engine import process_query, parse_nl_task
+from nl_engine import process_query, parse_nl_task, close_http_client
 from error_kb import (
     lookup_error,
     search_errors,
@@ -49,7 +52,7 @@ from error_kb import (
     ErrorCodeEntry,
 )
 from facility import ZONES, STATIONS, CHARGING_STATIONS
-from task_catalog import TASK_CATALOG, CATALOG_BY_ID, get_tasks_for_vendor, catalog_to_dict
+from task_catalog import TASK_CATALOG, CATALOG_BY_ID, catalog_to_json
 
 # --- Global State ---
 simulator: FleetSimulator | None = None
@@ -63,16 +66,36 @@ ws_connections: list[WebSocket] = []
 # Previous error states for RCA triggering
 _prev_error_robots: set[str] = set()
 
+# Full snapshots (trails, tasks, activity, alerts) go out every FULL_SYNC_TICKS;
+# the ticks in between only carry robot poses.
+FULL_SYNC_TICKS = 4
+
+# Simulation tick period (seconds)
+TICK_SECONDS = 0.5
+
+
+def _full_update_json() -> str:
+    """Serialize a full fleet snapshot for WebSocket clients."""
+    update = FleetUpdate(
+        robots=simulator.get_all_unified(),
+        alerts=conflict_engine.get_active_alerts() if conflict_engine else [],
+        timestamp=time.time(),
+    )
+    return update.model_dump_json()
+
 
 async def simulation_loop():
     """Background loop: ticks simulator every 500ms, checks conflicts every 2s, broadcasts state."""
     global _prev_error_robots
     tick_counter = 0
+    loop = asyncio.get_running_loop()
+    next_tick = loop.time()
 
     while True:
         try:
             if simulator is None:
-                await asyncio.sleep(0.5)
+                await asyncio.sleep(TICK_SECONDS)
+                next_tick = loop.time()
                 continue
 
             # Tick simulation
@@ -87,34 +110,32 @@ async def simulation_loop():
             new_errors = current_error_robots - _prev_error_robots
             _prev_error_robots = current_error_robots
 
-            # Run RCA for newly errored robots
+            # Run RCA for newly errored robots, concurrently
             if rca_engine and new_errors:
-                for robot_id in new_errors:
-                    try:
-                        analysis = await rca_engine.analyze_error(robot_id)
-                        if analysis and conflict_engine:
-                            # Attach RCA to relevant alerts
-                            for alert in conflict_engine.active_alerts.values():
-                                if robot_id in alert.affected_robots and not alert.rca_analysis:
-                                    alert.rca_analysis = analysis
-                    except Exception:
-                        pass
+                error_ids = list(new_errors)
+                analyses = await rca_engine.analyze_errors(error_ids)
+                for robot_id, analysis in zip(error_ids, analyses):
+                    if analysis and conflict_engine:
+                        # Attach RCA to relevant alerts
+                        for alert in conflict_engine.active_alerts.values():
+                            if robot_id in alert.affected_robots and not alert.rca_analysis:
+                                alert.rca_analysis = analysis
 
             # Check conflicts every 4 ticks (2 seconds)
             if conflict_engine and tick_counter % 4 == 0:
                 conflict_engine.check_all()
 
-            # Broadcast to WebSocket clients every tick
+            # Broadcast to WebSocket clients every tick: a full snapshot right
+            # after each conflict check, pose-only frames in between
             if ws_connections:
-                robots = simulator.get_all_unified()
-                alerts = conflict_engine.get_active_alerts() if conflict_engine else []
-
-                update = FleetUpdate(
-                    robots=robots,
-                    alerts=alerts,
-                    timestamp=datetime.now(),
-                )
-                data = update.model_dump_json()
+                if tick_counter % FULL_SYNC_TICKS == 0:
+                    data = _full_update_json()
+                else:
+                    update = PoseUpdate(
+                        robots=simulator.get_all_poses(),
+                        timestamp=time.time(),
+                    )
+                    data = update.model_dump_json()
 
                 disconnected = []
                 for ws in ws_connections:
@@ -129,7 +150,14 @@ async def simulation_loop():
         except Exception as e:
             print(f"Simulation loop error: {e}")
 
-        await asyncio.sleep(0.5)
+        # Sleep until the next tick deadline rather than a fixed 500ms, so RCA
+        # and broadcast time don't stretch the tick period. After an overrun
+        # the missed ticks are skipped instead of run back to back.
+        next_tick += TICK_SECONDS
+        now = loop.time()
+        while next_tick <= now:
+            next_tick += TICK_SECONDS
+        await asyncio.sleep(next_tick - now)
 
 
 @asynccontextmanager
@@ -158,6 +186,7 @@ async def lifespan(app: FastAPI):
         await task
     except asyncio.CancelledError:
         pass
+    await close_http_client()
 
 
 # --- FastAPI App ---
@@ -191,7 +220,8 @@ async def get_robots(
     if vendor:
         robots = [r for r in robots if r.vendor == vendor]
     if status:
-        robots = [r for r in robots if r.status.value == status]
+        wanted = ROBOT_STATUS_BY_VALUE.get(status)
+        robots = [r for r in robots if r.status is wanted]
     if zone:
         robots = [r for r in robots if r.zone == zone]
 
@@ -222,9 +252,9 @@ async def get_robot_history(robot_id: str):
         "total_distance": round(raw.total_distance, 1),
         "activity": [
             {
-                "timestamp": a["timestamp"].isoformat(),
+                "timestamp": to_iso(a["timestamp"]),
                 "description": a["description"],
-                "type": a["type"],
+                "type": a["type"].name.lower(),
             }
             for a in list(raw.activity)
         ],
@@ -232,7 +262,7 @@ async def get_robot_history(robot_id: str):
             {
                 "error_code": e["error_code"],
                 "name": e["name"],
-                "timestamp": e["timestamp"].isoformat(),
+                "timestamp": to_iso(e["timestamp"]),
                 "position": e.get("position", {}),
                 "zone": e.get("zone", ""),
             }
@@ -316,20 +346,8 @@ async def get_stations():
 @app.get("/api/task-catalog")
 async def get_task_catalog(vendor: Optional[str] = Query(None)):
     """Get all available task types, optionally filtered by vendor."""
-    if vendor:
-        tasks = get_tasks_for_vendor(vendor)
-        return [
-            {
-                "id": t.id,
-                "name": t.name,
-                "category": t.category,
-                "icon": t.icon,
-                "description": t.description,
-                "vendors": t.vendors,
-            }
-            for t in tasks
-        ]
-    return catalog_to_dict()
+    # The catalog is static, so the JSON body is encoded once at import
+    return Response(content=catalog_to_json(vendor), media_type="application/json")
 
 
 # --- Chat ---
@@ -475,6 +493,9 @@ async def get_facility():
 async def websocket_fleet(websocket: WebSocket):
     """Real-time fleet state stream."""
     await websocket.accept()
+    if simulator:
+        # New clients need the full state before pose frames mean anything
+        await websocket.send_text(_full_update_json())
     ws_connections.append(websocket)
     try:
         while True:
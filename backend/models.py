@@ -4,12 +4,13 @@ Pydantic models for FleetBridge unified robot fleet management.
 
 from __future__ import annotations
 
+import time
 import uuid
 from datetime import datetime
-from enum import Enum
-from typing import Optional
+from enum import Enum, IntEnum, IntFlag
+from typing import Annotated, Final, Literal, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, PlainSerializer, computed_field
 
 
 # --- Enums ---
@@ -52,47 +53,109 @@ class TaskStatus(str, Enum):
     CANCELLED = "cancelled"
 
 
+class AlertState(IntFlag):
+    """Alert lifecycle flags. Acknowledged and resolved are independent bits."""
+    NEW = 0
+    ACKNOWLEDGED = 1
+    RESOLVED = 2
+
+
 class ErrorSeverity(str, Enum):
     CRITICAL = "critical"
     WARNING = "warning"
     INFO = "info"
 
 
+# Value -> member lookups, built once at import. Map external strings through
+# these instead of calling the enum, which goes through EnumMeta.__call__.
+ROBOT_STATUS_BY_VALUE: Final[dict[str, RobotStatus]] = {s.value: s for s in RobotStatus}
+ALERT_SEVERITY_BY_VALUE: Final[dict[str, AlertSeverity]] = {s.value: s for s in AlertSeverity}
+ALERT_TYPE_BY_VALUE: Final[dict[str, AlertType]] = {t.value: t for t in AlertType}
+TASK_TYPE_BY_VALUE: Final[dict[str, TaskType]] = {t.value: t for t in TaskType}
+TASK_STATUS_BY_VALUE: Final[dict[str, TaskStatus]] = {s.value: s for s in TaskStatus}
+ERROR_SEVERITY_BY_VALUE: Final[dict[str, ErrorSeverity]] = {s.value: s for s in ErrorSeverity}
+
+
+class ActivityType(IntEnum):
+    """Activity log entry kinds. Sent to clients as the int code."""
+    TASK_STARTED = 1
+    TASK_COMPLETED = 2
+    TASK_CANCELLED = 3
+    CHARGING_START = 4
+    CHARGING_COMPLETE = 5
+    ERROR = 6
+    ERROR_RESOLVED = 7
+    COMMAND = 8
+
+
+# --- Timestamps ---
+
+def to_iso(ts: float) -> str:
+    """Format a Unix timestamp as a local ISO-8601 string."""
+    return datetime.fromtimestamp(ts).isoformat()
+
+
+# Stored as Unix epoch seconds (time.time()); serialized as ISO-8601 strings
+# so clients see the same format a datetime field would produce.
+Timestamp = Annotated[float, PlainSerializer(to_iso, return_type=str)]
+
+
+# --- Base Model ---
+
+class FleetModel(BaseModel):
+    """
+    Base for all FleetBridge models. Data flows between trusted internal
+    components, so pydantic's safety nets (assignment validation, revalidating
+    nested instances) and unused string/alias handling are switched off
+    explicitly. Enum members are kept as-is (no use_enum_values) because callers
+    compare them by identity and read .value.
+    """
+
+    model_config = ConfigDict(
+        extra="ignore",
+        validate_assignment=False,
+        revalidate_instances="never",
+        str_strip_whitespace=False,
+        populate_by_name=False,
+        protected_namespaces=(),
+    )
+
+
 # --- Core Models ---
 
-class Position(BaseModel):
+class Position(FleetModel):
     x: float
     y: float
 
 
-class Task(BaseModel):
+class Task(FleetModel):
     task_id: str
-    task_type: TaskType
+    task_type: TaskType | str  # catalog tasks carry their display name
     from_station: str
     to_station: str
     status: TaskStatus = TaskStatus.IN_PROGRESS
-    started_at: datetime
-    completed_at: Optional[datetime] = None
+    started_at: Timestamp
+    completed_at: Optional[Timestamp] = None
     eta_seconds: Optional[float] = None
 
 
-class ActivityEntry(BaseModel):
-    timestamp: datetime
+class ActivityEntry(FleetModel):
+    timestamp: Timestamp
     description: str
-    activity_type: str  # "task_started", "task_completed", "error", "charging", etc.
+    activity_type: ActivityType
 
 
-class ErrorInfo(BaseModel):
+class ErrorInfo(FleetModel):
     error_code: str
     vendor_code: str  # original vendor error code
     name: str
     description: str
-    timestamp: datetime
+    timestamp: Timestamp
     resolved: bool = False
-    resolved_at: Optional[datetime] = None
+    resolved_at: Optional[Timestamp] = None
 
 
-class UnifiedRobotState(BaseModel):
+class UnifiedRobotState(FleetModel):
     id: str
     name: str
     vendor: str
@@ -107,12 +170,12 @@ class UnifiedRobotState(BaseModel):
     last_error: Optional[ErrorInfo] = None
     trail: list[Position] = Field(default_factory=list)
     zone: str = ""
-    last_updated: datetime = Field(default_factory=datetime.now)
+    last_updated: Timestamp = Field(default_factory=time.time)
 
 
 # --- Alert Models ---
 
-class Alert(BaseModel):
+class Alert(FleetModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4())[:8])
     alert_type: AlertType
     severity: AlertSeverity
@@ -122,29 +185,38 @@ class Alert(BaseModel):
     suggested_action: str
     position: Optional[Position] = None
     rca_analysis: Optional[str] = None  # root cause analysis text
-    acknowledged: bool = False
-    resolved: bool = False
-    created_at: datetime = Field(default_factory=datetime.now)
-    acknowledged_at: Optional[datetime] = None
-    resolved_at: Optional[datetime] = None
+    state: AlertState = Field(default=AlertState.NEW, exclude=True)  # internal; exposed as the two flags below
+    created_at: Timestamp = Field(default_factory=time.time)
+    acknowledged_at: Optional[Timestamp] = None
+    resolved_at: Optional[Timestamp] = None
+
+    @computed_field
+    @property
+    def acknowledged(self) -> bool:
+        return bool(self.state & AlertState.ACKNOWLEDGED)
+
+    @computed_field
+    @property
+    def resolved(self) -> bool:
+        return bool(self.state & AlertState.RESOLVED)
 
 
 # --- Chat Models ---
 
-class ChatMessage(BaseModel):
+class ChatMessage(FleetModel):
     role: str  # "user" or "assistant"
     content: str
-    timestamp: datetime = Field(default_factory=datetime.now)
+    timestamp: Timestamp = Field(default_factory=time.time)
     robot_ids: list[str] = Field(default_factory=list)  # referenced robots for "Show on Map"
     suggested_followups: list[str] = Field(default_factory=list)
 
 
-class ChatRequest(BaseModel):
+class ChatRequest(FleetModel):
     query: str
     conversation_id: Optional[str] = None
 
 
-class ChatResponse(BaseModel):
+class ChatResponse(FleetModel):
     response: str
     conversation_id: str
     robot_ids: list[str] = Field(default_factory=list)
@@ -154,7 +226,7 @@ class ChatResponse(BaseModel):
 
 # --- Analytics Models ---
 
-class DailySummary(BaseModel):
+class DailySummary(FleetModel):
     total_tasks: int = 0
     total_distance_km: float = 0.0
     avg_task_time_min: float = 0.0
@@ -167,7 +239,7 @@ class DailySummary(BaseModel):
     uptime_change_percent: float = 0.0
 
 
-class VendorMetrics(BaseModel):
+class VendorMetrics(FleetModel):
     vendor: str
     robot_count: int = 0
     total_tasks: int = 0
@@ -179,7 +251,7 @@ class VendorMetrics(BaseModel):
     avg_battery: float = 0.0
 
 
-class RobotPerformance(BaseModel):
+class RobotPerformance(FleetModel):
     robot_id: str
     vendor: str
     tasks_completed: int = 0
@@ -190,7 +262,7 @@ class RobotPerformance(BaseModel):
     needs_attention: bool = False
 
 
-class ZoneMetrics(BaseModel):
+class ZoneMetrics(FleetModel):
     zone: str
     task_count: int = 0
     error_count: int = 0
@@ -201,7 +273,10 @@ class ZoneMetrics(BaseModel):
 
 # --- Error Knowledge Base Models ---
 
-class ErrorCodeEntry(BaseModel):
+class ErrorCodeEntry(FleetModel):
+    # Entries are shared through the KB's lookup tables; never mutated
+    model_config = ConfigDict(frozen=True)
+
     code: str
     vendor: str
     models: str  # "All Amazon AMRs", etc.
@@ -217,7 +292,21 @@ class ErrorCodeEntry(BaseModel):
 
 # --- WebSocket Models ---
 
-class FleetUpdate(BaseModel):
+class FleetUpdate(FleetModel):
+    """Full fleet snapshot, sent on connect and every few ticks."""
+    type: Literal["full"] = "full"
     robots: list[UnifiedRobotState]
     alerts: list[Alert]
-    timestamp: datetime = Field(default_factory=datetime.now)
+    timestamp: Timestamp = Field(default_factory=time.time)
+
+
+# Hot per-tick robot fields, sent as a positional array to keep frames small:
+# [id, x, y, heading, speed, status, battery]
+RobotPose = tuple[str, float, float, float, float, RobotStatus, float]
+
+
+class PoseUpdate(FleetModel):
+    """Pose-only frame sent between full snapshots; clients merge it by robot ID."""
+    type: Literal["pose"] = "pose"
+    robots: list[RobotPose]
+    timestamp: Timestamp = Field(default_factory=time.time)
@@ -7,30 +7,112 @@ based on real-time fleet data, alerts, analytics, and task catalog.
 from __future__ import annotations
 
 import json
+import logging
 import os
+import random
+import re
+import time
 import uuid
-from datetime import datetime
-from typing import Any, Optional
+from collections import Counter, OrderedDict, defaultdict, deque
+from functools import lru_cache
+from operator import attrgetter, itemgetter
+from typing import Any, Callable, Iterable, Optional
+
+import httpx
 
 from models import (
+    AlertSeverity,
     ChatResponse,
     RobotStatus,
     UnifiedRobotState,
 )
 from simulator import FleetSimulator
-from error_kb import lookup_error, search_errors, get_equivalent_errors, ALL_ERRORS
+from facility import (
+    ZONES,
+    STATIONS,
+    CHARGING_STATIONS,
+    ZONE_NEAREST_STATION,
+    get_nearest_charging_station,
+)
+from task_catalog import TASK_KEYWORDS, TaskDef, get_tasks_for_vendor
+from error_kb import find_error_code, search_errors, get_equivalent_errors, ALL_ERRORS
+
+
+@lru_cache(maxsize=1)
+def _main_module():
+    """The app module, for its engine globals (imported late: main imports us)."""
+    import main
+    return main
+
+
+@lru_cache(maxsize=1)
+def _genai_module():
+    """google.generativeai, imported on first use; None when it is not installed."""
+    try:
+        import google.generativeai as genai
+    except ImportError:
+        return None
+    return genai
+
+# Conversation history store, in Gemini "contents" shape ({"role": "user" |
+# "model", "parts": [...]}); each history keeps only its latest messages,
+# and the least recently used conversations are dropped past the cap
+_HISTORY_LENGTH = 20
+_MAX_CONVERSATIONS = 1000
+_conversations: OrderedDict[str, deque[dict]] = OrderedDict()
+
+# Per-robot detail line of the fleet context, with the names it can be focused by
+RobotDetail = tuple[frozenset[str], str]
+
+# Last built (simulator.state_version, ...) for each LLM context section
+_ctx_cache: tuple[int, str, list[RobotDetail]] | None = None
+_analytics_ctx_cache: tuple[int, str] | None = None
+
+# Vendor and zone names a query can focus the robot list on
+_FOCUS_NAMES = {name.lower(): name for name in ("Amazon Normal", "Balyo", "Amazon Internal", *ZONES)}
+_FOCUS_RE = re.compile(r"\b(?:" + "|".join(map(re.escape, _FOCUS_NAMES)) + r")\b")
+
+
+def _query_focus(ql: str, simulator: FleetSimulator) -> frozenset[str]:
+    """Robot IDs, vendors and zones named in a lowercased query."""
+    names = {_FOCUS_NAMES[m] for m in _FOCUS_RE.findall(ql)}
+    tokens = set(_TOKEN_RE.findall(ql))
+    names.update(rid for rid in simulator.robots if rid.lower() in tokens)
+    return frozenset(names)
+
+
+def _get_fleet_context(simulator: FleetSimulator, focus: frozenset[str] = frozenset()) -> str:
+    """Fleet context for the LLM, rebuilt only when the simulator state has changed.
+
+    With a focus, the per-robot list only keeps robots matching one of the
+    focus IDs, vendors or zones; the fleet-wide sections stay complete.
+    """
+    global _ctx_cache
+    version = simulator.state_version
+    if _ctx_cache is None or _ctx_cache[0] != version:
+        _ctx_cache = (version, *_build_fleet_context(simulator))
+    _, head, details = _ctx_cache
+
+    if focus:
+        shown = [line for keys, line in details if not focus.isdisjoint(keys)]
+    else:
+        shown = [line for _, line in details]
+    if len(shown) < len(details):
+        shown.append(f"  ... {len(details) - len(shown)} other robots omitted (fleet-wide figures above include them)")
+    return "\n".join([head, *shown])
 
-# Conversation history store
-_conversations: dict[str, list[dict]] = {}
 
+def _build_fleet_context(simulator: FleetSimulator) -> tuple[str, list[RobotDetail]]:
+    """Build a comprehensive text summary of the current fleet state for the LLM.
 
-def _get_fleet_context(simulator: FleetSimulator) -> str:
-    """Build a comprehensive text summary of the current fleet state for the LLM."""
+    Returns the fleet-wide sections and the per-robot detail lines separately
+    so callers can trim the robot list to what a query is about.
+    """
     robots = simulator.get_all_unified()
     summary = simulator.get_fleet_summary()
 
     lines = [
-        f"═══ FLEET STATUS (as of {datetime.now().strftime('%H:%M:%S')}) ═══",
+        f"═══ FLEET STATUS (as of {time.strftime('%H:%M:%S')}) ═══",
         f"Total robots: {summary['total_robots']}",
         f"  Active: {summary['active']}, Idle: {summary['idle']}, "
         f"Error: {summary['error']}, Charging: {summary['charging']}, "
@@ -41,39 +123,70 @@ def _get_fleet_context(simulator: FleetSimulator) -> str:
         "",
     ]
 
-    # ── Fleet-wide metrics ──
-    total_tasks = sum(r.tasks_completed for r in simulator.robots.values())
-    total_distance = sum(r.total_distance for r in simulator.robots.values())
-    total_errors = sum(len(r.error_history) for r in simulator.robots.values())
-    avg_battery = sum(r.battery for r in robots) / len(robots) if robots else 0
+    # One pass over the fleet collects every aggregate and bucket the sections
+    # below need. Per-vendor stats come from the raw robots, the rest from the
+    # unified view (same order: both iterate simulator.robots).
+    total_tasks = 0
+    total_distance = 0.0
+    total_errors = 0
+    batt_sum = 0.0
+    lowest = robots[0] if robots else None
+    # vendor -> [robots, tasks, errors, battery sum, active, idle, error, charging]
+    vendor_stats: dict[str, list] = {
+        "Amazon Normal": [0, 0, 0, 0.0, 0, 0, 0, 0],
+        "Balyo": [0, 0, 0, 0.0, 0, 0, 0, 0],
+        "Amazon Internal": [0, 0, 0, 0.0, 0, 0, 0, 0],
+    }
+    zone_ids: dict[str, list[str]] = {}
+    error_robots: list[UnifiedRobotState] = []
+    low_batt: list[UnifiedRobotState] = []
+    for raw, r in zip(simulator.robots.values(), robots):
+        n_errors = raw.error_count
+        total_tasks += raw.tasks_completed
+        total_distance += raw.total_distance
+        total_errors += n_errors
+        batt_sum += r.battery
+        if r.battery < lowest.battery:
+            lowest = r
+
+        v = vendor_stats[raw.vendor]
+        v[0] += 1
+        v[1] += raw.tasks_completed
+        v[2] += n_errors
+        v[3] += raw.battery
+        status = raw.status
+        if status is RobotStatus.ACTIVE:
+            v[4] += 1
+        elif status is RobotStatus.IDLE:
+            v[5] += 1
+        elif status is RobotStatus.ERROR:
+            v[6] += 1
+        elif status is RobotStatus.CHARGING:
+            v[7] += 1
+
+        zone_ids.setdefault(r.zone, []).append(r.id)
+        if r.status is RobotStatus.ERROR or (r.last_error and not r.last_error.resolved):
+            error_robots.append(r)
+        if r.battery < 25:
+            low_batt.append(r)
+    avg_battery = batt_sum / len(robots) if robots else 0
 
     lines.append("═══ KEY METRICS ═══")
     lines.append(f"  Total tasks completed: {total_tasks}")
     lines.append(f"  Total distance: {total_distance * 0.025:.1f} km")
     lines.append(f"  Total errors today: {total_errors}")
     lines.append(f"  Average battery: {avg_battery:.0f}%")
-    lines.append(f"  Lowest battery: {min(r.battery for r in robots):.0f}% ({min(robots, key=lambda r: r.battery).id})")
+    lines.append(f"  Lowest battery: {lowest.battery:.0f}% ({lowest.id})")
     lines.append("")
 
     # ── Per-vendor summary ──
     lines.append("═══ VENDOR BREAKDOWN ═══")
-    vendor_groups: dict[str, list] = {"Amazon Normal": [], "Balyo": [], "Amazon Internal": []}
-    for r in simulator.robots.values():
-        vendor_groups[r.vendor].append(r)
-
-    for vendor, group in vendor_groups.items():
-        if not group:
+    for vendor, (count, v_tasks, v_errors, v_batt_sum, v_active, v_idle, v_error, v_charging) in vendor_stats.items():
+        if not count:
             continue
-        v_tasks = sum(r.tasks_completed for r in group)
-        v_errors = sum(len(r.error_history) for r in group)
-        v_avg_battery = sum(r.battery for r in group) / len(group)
-        v_active = sum(1 for r in group if r.status == RobotStatus.ACTIVE)
-        v_idle = sum(1 for r in group if r.status == RobotStatus.IDLE)
-        v_error = sum(1 for r in group if r.status == RobotStatus.ERROR)
-        v_charging = sum(1 for r in group if r.status == RobotStatus.CHARGING)
         lines.append(
-            f"  {vendor} ({len(group)} robots): "
-            f"Tasks={v_tasks}, Errors={v_errors}, AvgBatt={v_avg_battery:.0f}%, "
+            f"  {vendor} ({count} robots): "
+            f"Tasks={v_tasks}, Errors={v_errors}, AvgBatt={v_batt_sum / count:.0f}%, "
             f"Active={v_active}, Idle={v_idle}, Error={v_error}, Charging={v_charging}"
         )
     lines.append("")
@@ -81,9 +194,8 @@ def _get_fleet_context(simulator: FleetSimulator) -> str:
     # ── Active alerts ──
     lines.append("═══ ACTIVE ALERTS ═══")
     try:
-        from conflict_engine import ConflictEngine
         # Access alerts via the global conflict_engine
-        import main as main_module
+        main_module = _main_module()
         if main_module.conflict_engine:
             active_alerts = main_module.conflict_engine.get_active_alerts()
             if active_alerts:
@@ -102,20 +214,14 @@ def _get_fleet_context(simulator: FleetSimulator) -> str:
 
     # ── Zone occupancy ──
     lines.append("═══ ZONE OCCUPANCY ═══")
-    from facility import ZONES
-    for zone_name, bounds in ZONES.items():
-        zone_robots = [
-            r for r in robots
-            if bounds["x_min"] <= r.position.x <= bounds["x_max"]
-            and bounds["y_min"] <= r.position.y <= bounds["y_max"]
-        ]
-        if zone_robots:
-            ids = [r.id for r in zone_robots]
-            lines.append(f"  {zone_name}: {len(zone_robots)} robots ({', '.join(ids)})")
+    # Zones don't overlap, so each robot's own zone is its only bucket
+    for zone_name in ZONES:
+        ids = zone_ids.get(zone_name)
+        if ids:
+            lines.append(f"  {zone_name}: {len(ids)} robots ({', '.join(ids)})")
     lines.append("")
 
     # ── Robots with errors ──
-    error_robots = [r for r in robots if r.status == RobotStatus.ERROR or (r.last_error and not r.last_error.resolved)]
     if error_robots:
         lines.append("═══ ROBOTS WITH ERRORS ═══")
         for r in error_robots:
@@ -129,7 +235,6 @@ def _get_fleet_context(simulator: FleetSimulator) -> str:
         lines.append("")
 
     # ── Low battery robots ──
-    low_batt = [r for r in robots if r.battery < 25]
     if low_batt:
         low_batt.sort(key=lambda r: r.battery)
         lines.append("═══ LOW BATTERY ROBOTS (<25%) ═══")
@@ -139,6 +244,7 @@ def _get_fleet_context(simulator: FleetSimulator) -> str:
 
     # ── All robots detail ──
     lines.append("═══ ALL ROBOTS ═══")
+    details: list[RobotDetail] = []
     for r in robots:
         task_info = "No task"
         if r.current_task:
@@ -154,19 +260,29 @@ def _get_fleet_context(simulator: FleetSimulator) -> str:
             if r.last_error.resolved:
                 error_info += " [RESOLVED]"
 
-        lines.append(
+        details.append((
+            frozenset((r.id, r.vendor, r.zone)),
             f"  {r.id} | {r.vendor} | {r.model} | {r.status.value} | "
             f"Batt: {r.battery:.0f}% | Pos: ({r.position.x:.1f}, {r.position.y:.1f}) | "
-            f"Zone: {r.zone} | Speed: {r.speed:.1f} m/s | {task_info}{error_info}"
-        )
+            f"Zone: {r.zone} | Speed: {r.speed:.1f} m/s | {task_info}{error_info}",
+        ))
 
-    return "\n".join(lines)
+    return "\n".join(lines), details
 
 
 def _get_analytics_context(simulator: FleetSimulator) -> str:
+    """Analytics context for the LLM, rebuilt only when the simulator state has changed."""
+    global _analytics_ctx_cache
+    version = simulator.state_version
+    if _analytics_ctx_cache is None or _analytics_ctx_cache[0] != version:
+        _analytics_ctx_cache = (version, _build_analytics_context(simulator))
+    return _analytics_ctx_cache[1]
+
+
+def _build_analytics_context(simulator: FleetSimulator) -> str:
     """Build analytics summary for deeper analysis queries."""
     try:
-        import main as main_module
+        main_module = _main_module()
         if main_module.analytics_engine:
             ae = main_module.analytics_engine
             summary = ae.get_daily_summary()
@@ -253,6 +369,55 @@ response_type categories:
 You have access to real-time fleet data, analytics, and alert information which is provided with each query."""
 
 
+def _keyword_re(*keywords: str) -> re.Pattern[str]:
+    """Compile keywords into one alternation that matches any of them as a substring."""
+    return re.compile("|".join(map(re.escape, keywords)))
+
+
+# ── Query routing keywords ──
+# Each list is compiled into a single alternation below, so routing scans the
+# query once per list instead of once per keyword.
+
+# Queries the local fallback can answer without the LLM
+_FALLBACK_PATTERNS = [
+    # Location
+    "where is", "where's", "location of", "find ",
+    # Status
+    "fleet status", "how many", "status", "what's the fleet",
+    # Battery
+    "battery", "charge", "low battery", "below",
+    # Errors
+    "error", "errors", "failing", "broken", "issue",
+    # Alerts
+    "alert", "alerts", "warning", "critical",
+    # Performance
+    "top performer", "best robot", "worst robot", "ranking",
+    # Comparison
+    "compare", "vs", "versus", "comparison",
+    # Zones
+    "zone", "populated", "congested", "crowded",
+    # Robot spotlight
+    "tell me more", "tell me about", "show me a robot", "pick a robot",
+    "describe a robot", "random robot", "spotlight", "one of these robots",
+    "about a robot",
+]
+
+# Queries that get the analytics summary added to the LLM prompt
+_ANALYSIS_KEYWORDS = [
+    "compare", "performance", "analytics", "trend", "average", "best", "worst",
+    "top", "bottom", "throughput", "efficiency", "utilization", "how is", "how are",
+    "analyze", "analysis", "report", "summary", "overview", "breakdown",
+    "vendor", "zone", "uptime", "productivity", "populated", "busy", "congested",
+    "crowded", "most", "least", "which", "what zone", "what is",
+]
+
+_FALLBACK_RE = _keyword_re(*_FALLBACK_PATTERNS)
+_ANALYSIS_RE = _keyword_re(*_ANALYSIS_KEYWORDS)
+_ERROR_MENTION_RE = re.compile("error|failing|broken|issue|problem")
+# ID-shaped tokens of a lowercased query, for robot ID lookups
+_TOKEN_RE = re.compile(r"[a-z0-9-]+")
+
+
 async def process_query(
     query: str,
     simulator: FleetSimulator,
@@ -264,33 +429,43 @@ async def process_query(
         conversation_id = str(uuid.uuid4())[:8]
 
     # Get or create conversation history
-    if conversation_id not in _conversations:
-        _conversations[conversation_id] = []
+    history = _conversations.get(conversation_id)
+    if history is None:
+        history = _conversations[conversation_id] = deque(maxlen=_HISTORY_LENGTH)
+        if len(_conversations) > _MAX_CONVERSATIONS:
+            _conversations.popitem(last=False)
+    else:
+        _conversations.move_to_end(conversation_id)
 
-    history = _conversations[conversation_id]
+    words = query.replace(",", " ").replace("?", " ").split()
 
-    # Build fleet context
-    robots = simulator.get_all_unified()
-    fleet_context = _get_fleet_context(simulator)
-
-    # Build analytics context for analysis-type queries
-    analytics_context = ""
-    analysis_keywords = [
-        "compare", "performance", "analytics", "trend", "average", "best", "worst",
-        "top", "bottom", "throughput", "efficiency", "utilization", "how is", "how are",
-        "analyze", "analysis", "report", "summary", "overview", "breakdown",
-        "vendor", "zone", "uptime", "productivity", "populated", "busy", "congested",
-        "crowded", "most", "least", "which", "what zone", "what is",
-    ]
-    if any(kw in query.lower() for kw in analysis_keywords):
-        analytics_context = "\n\n" + _get_analytics_context(simulator)
+    # Check if the fallback can handle this query locally (instant response)
+    ql = query.lower()
+    use_fallback = _FALLBACK_RE.search(ql) is not None
 
-    # Check for error code references in query
-    error_context = ""
-    words = query.replace(",", " ").replace("?", " ").split()
-    for word in words:
-        err = lookup_error(word.upper())
-        if err:
+    # Also use fallback if query contains a specific robot ID
+    if not use_fallback:
+        use_fallback = not simulator.robot_ids_lower.isdisjoint(_TOKEN_RE.findall(ql))
+
+    # Also use fallback if query contains a specific error code
+    error_hits = [err for word in words if (err := find_error_code(word))]
+    if not use_fallback:
+        use_fallback = bool(error_hits)
+
+    if use_fallback:
+        response_data = _generate_fallback_response(ql, words, simulator)
+    else:
+        # Everything below only feeds the LLM prompt; the fallback builds its
+        # own answer straight from the simulator.
+
+        # Build analytics context for analysis-type queries
+        analytics_context = ""
+        if _ANALYSIS_RE.search(ql):
+            analytics_context = "\n\n" + _get_analytics_context(simulator)
+
+        # Check for error code references in query
+        error_context = ""
+        for err in error_hits:
             equiv = get_equivalent_errors(err.code)
             error_context += (
                 f"\nERROR CODE INFO for {err.code}:\n"
@@ -307,62 +482,20 @@ async def process_query(
                 for e in equiv:
                     error_context += f"    - {e.code} ({e.vendor}): {e.name}\n"
 
-    # Search for error-related info if query mentions errors generically
-    if any(kw in query.lower() for kw in ["error", "errors", "failing", "broken", "issue", "problem"]):
-        # Search for error keywords from the query
-        for word in words:
-            if len(word) > 3 and word.lower() not in ["error", "errors", "what", "which", "robot", "robots", "have", "with", "today"]:
-                results = search_errors(word)
-                if results and not error_context:
-                    for r in results[:3]:
-                        error_context += (
-                            f"\nRelated error: {r.code} ({r.vendor}): {r.name} — {r.description}\n"
-                        )
-
-    # Check if the fallback can handle this query locally (instant response)
-    _fallback_patterns = [
-        # Location
-        "where is", "where's", "location of", "find ",
-        # Status
-        "fleet status", "how many", "status", "what's the fleet",
-        # Battery
-        "battery", "charge", "low battery", "below",
-        # Errors
-        "error", "errors", "failing", "broken", "issue",
-        # Alerts
-        "alert", "alerts", "warning", "critical",
-        # Performance
-        "top performer", "best robot", "worst robot", "ranking",
-        # Comparison
-        "compare", "vs", "versus", "comparison",
-        # Zones
-        "zone", "populated", "congested", "crowded",
-        # Robot spotlight
-        "tell me more", "tell me about", "show me a robot", "pick a robot",
-        "describe a robot", "random robot", "spotlight", "one of these robots",
-        "about a robot",
-    ]
-    ql = query.lower()
-    use_fallback = any(pat in ql for pat in _fallback_patterns)
-
-    # Also use fallback if query contains a specific robot ID
-    if not use_fallback:
-        for r in robots:
-            if r.id.lower() in ql:
-                use_fallback = True
-                break
-
-    # Also use fallback if query contains a specific error code
-    if not use_fallback:
-        for word in words:
-            if lookup_error(word.upper()):
-                use_fallback = True
-                break
+        # Search for error-related info if query mentions errors generically
+        if _ERROR_MENTION_RE.search(ql):
+            # Search for error keywords from the query
+            for word in words:
+                if len(word) > 3 and word.lower() not in ["error", "errors", "what", "which", "robot", "robots", "have", "with", "today"]:
+                    results = search_errors(word)
+                    if results and not error_context:
+                        for r in results[:3]:
+                            error_context += (
+                                f"\nRelated error: {r.code} ({r.vendor}): {r.name} — {r.description}\n"
+                            )
 
-    if use_fallback:
-        response_data = _generate_fallback_response(query, simulator)
-    else:
         # Build the prompt for the LLM
+        fleet_context = _get_fleet_context(simulator, _query_focus(ql, simulator))
         user_message = f"""CURRENT FLEET DATA:
 {fleet_context}
 {analytics_context}
@@ -372,16 +505,18 @@ OPERATOR QUESTION: {query}
 
 Respond with a JSON object containing "response" (markdown text), "robot_ids" (list), "suggested_followups" (list of 3), and "response_type" (one of: status, analysis, recommendation, error_lookup, action)."""
 
-        # Add to conversation history
-        history.append({"role": "user", "content": user_message})
+        # The fleet snapshot only goes out with the turn it was built for;
+        # history keeps the operator's question, so later turns don't resend
+        # stale robot states
+        contents = [*history, {"role": "user", "parts": [{"text": user_message}]}]
+        history.append({"role": "user", "parts": [{"text": query}]})
 
         # Try Gemini API
         try:
-            response_data = await _call_gemini(history)
+            response_data = await _call_gemini(contents)
         except Exception as e:
-            import logging
             logging.warning(f"Gemini API failed: {type(e).__name__}: {e}")
-            response_data = _generate_fallback_response(query, simulator)
+            response_data = _generate_fallback_response(ql, words, simulator)
 
     # Parse response
     response_text = response_data.get("response", "I couldn't process that query. Please try again.")
@@ -390,11 +525,7 @@ Respond with a JSON object containing "response" (markdown text), "robot_ids" (l
     response_type = response_data.get("response_type", "status")
 
     # Add assistant response to history
-    history.append({"role": "assistant", "content": response_text})
-
-    # Keep conversation history manageable
-    if len(history) > 20:
-        history[:] = history[-20:]
+    history.append({"role": "model", "parts": [{"text": response_text}]})
 
     return ChatResponse(
         response=response_text,
@@ -406,29 +537,53 @@ Respond with a JSON object containing "response" (markdown text), "robot_ids" (l
 
 
 _GEMINI_MODELS = ["gemini-2.5-flash", "gemini-2.0-flash", "gemini-2.0-flash-lite"]
+_SYSTEM_INSTRUCTION = {"parts": [{"text": SYSTEM_PROMPT}]}
 
+# Shared client so Gemini calls reuse pooled keep-alive connections instead
+# of paying a TLS handshake per query. Created lazily inside the running loop.
+_http_client: httpx.AsyncClient | None = None
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(timeout=30.0)
+    return _http_client
 
-async def _call_gemini(history: list[dict]) -> dict:
-    """Call Google Gemini REST API directly via httpx with model fallback."""
-    import httpx
-    import logging
 
+async def close_http_client() -> None:
+    """Close the shared Gemini HTTP client (called on app shutdown)."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+async def _call_gemini_model(
+    client: httpx.AsyncClient, model_name: str, api_key: str, payload: dict
+) -> dict:
+    """Run one generateContent call; raises on HTTP errors, including 429s."""
+    url = f"https://generativelanguage.googleapis.com/v1beta/models/{model_name}:generateContent?key={api_key}"
+    resp = await client.post(url, json=payload)
+    resp.raise_for_status()
+    data = resp.json()
+
+    # Extract text from response
+    text = data["candidates"][0]["content"]["parts"][0]["text"]
+    logging.info(f"Gemini {model_name}: success")
+    return _parse_gemini_response(text)
+
+
+async def _call_gemini(contents: list[dict]) -> dict:
+    """Call Google Gemini REST API directly via httpx with model fallback."""
     api_key = os.getenv("GEMINI_API_KEY", "")
     if not api_key:
         raise ValueError("GEMINI_API_KEY not set")
 
-    # Build contents array with system instruction + conversation
-    contents = []
-    # Add conversation history (all but last message)
-    for msg in history[:-1]:
-        role = "user" if msg["role"] == "user" else "model"
-        contents.append({"role": role, "parts": [{"text": msg["content"]}]})
-
-    # Add final message with system prompt prepended
-    full_prompt = f"{SYSTEM_PROMPT}\n\n{history[-1]['content']}"
-    contents.append({"role": "user", "parts": [{"text": full_prompt}]})
-
+    # Contents are already in Gemini's shape; the system prompt goes in
+    # systemInstruction instead of the latest turn
     payload = {
+        "systemInstruction": _SYSTEM_INSTRUCTION,
         "contents": contents,
         "generationConfig": {
             "temperature": 0.7,
@@ -436,43 +591,31 @@ async def _call_gemini(history: list[dict]) -> dict:
         },
     }
 
-    last_error = None
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        for model_name in _GEMINI_MODELS:
-            url = f"https://generativelanguage.googleapis.com/v1beta/models/{model_name}:generateContent?key={api_key}"
-            try:
-                resp = await client.post(url, json=payload)
-                if resp.status_code == 429:
-                    logging.warning(f"Gemini {model_name}: rate limited, trying next model")
-                    last_error = Exception(f"Rate limited on {model_name}")
-                    continue
-                resp.raise_for_status()
-                data = resp.json()
-
-                # Extract text from response
-                text = data["candidates"][0]["content"]["parts"][0]["text"]
-                logging.info(f"Gemini {model_name}: success")
-                return _parse_gemini_response(text)
-
-            except httpx.HTTPStatusError as e:
-                logging.warning(f"Gemini {model_name}: HTTP {e.response.status_code}")
-                last_error = e
-                continue
-            except Exception as e:
-                logging.warning(f"Gemini {model_name}: {type(e).__name__}: {e}")
-                last_error = e
-                continue
+    # Models are tried one after another, moving on only when one fails
+    # (429s included); each call is bounded by the shared client's timeout
+    last_error: Exception | None = None
+    client = _get_http_client()
+    for model_name in _GEMINI_MODELS:
+        try:
+            return await _call_gemini_model(client, model_name, api_key, payload)
+        except httpx.HTTPStatusError as e:
+            logging.warning(f"Gemini {model_name}: HTTP {e.response.status_code}")
+            last_error = e
+        except Exception as e:
+            logging.warning(f"Gemini {model_name}: {type(e).__name__}: {e}")
+            last_error = e
 
     raise last_error or Exception("All Gemini models failed")
 
 
+_FENCE_RE = re.compile(r'```(?:json)?\s*(\{.*\})\s*```', re.DOTALL)
+_JSON_DECODER = json.JSONDecoder()
+
+
 def _parse_gemini_response(text: str) -> dict:
     """Parse JSON from Gemini response text."""
-    import re
-    import logging
-
     # Strategy 1: Extract JSON from code fences using regex (handles nested backticks)
-    fence_match = re.search(r'```(?:json)?\s*(\{.*\})\s*```', text, re.DOTALL)
+    fence_match = _FENCE_RE.search(text)
     if fence_match:
         try:
             parsed = json.loads(fence_match.group(1))
@@ -483,567 +626,636 @@ def _parse_gemini_response(text: str) -> dict:
         except json.JSONDecodeError:
             pass
 
-    # Strategy 2: Find the outermost JSON object with brace matching
+    # Strategy 2: Decode the first complete JSON object in the text. raw_decode
+    # stops at the object's end and understands braces inside strings.
     start = text.find("{")
-    if start != -1:
-        depth = 0
-        end = start
-        for i in range(start, len(text)):
-            if text[i] == "{":
-                depth += 1
-            elif text[i] == "}":
-                depth -= 1
-                if depth == 0:
-                    end = i + 1
-                    break
+    while start != -1:
         try:
-            parsed = json.loads(text[start:end])
-            parsed.setdefault("robot_ids", [])
-            parsed.setdefault("suggested_followups", [])
-            parsed.setdefault("response_type", "status")
-            return parsed
+            parsed, _ = _JSON_DECODER.raw_decode(text, start)
         except json.JSONDecodeError:
-            logging.warning(f"Gemini JSON parse failed, returning raw text")
+            start = text.find("{", start + 1)
+            continue
+        parsed.setdefault("robot_ids", [])
+        parsed.setdefault("suggested_followups", [])
+        parsed.setdefault("response_type", "status")
+        return parsed
+    if "{" in text:
+        logging.warning(f"Gemini JSON parse failed, returning raw text")
 
     # Strategy 3: Return raw text as-is
     return {"response": text, "robot_ids": [], "suggested_followups": [], "response_type": "status"}
 
 
-def _generate_fallback_response(query: str, simulator: FleetSimulator) -> dict:
-    """Generate a comprehensive response locally when Gemini is unavailable."""
-    query_lower = query.lower()
-    robots = simulator.get_all_unified()
-    robot_ids: list[str] = []
-    followups: list[str] = []
-
-    # ── Location queries ──
-    if any(kw in query_lower for kw in ["where is", "where's", "location of", "find"]):
-        for r in robots:
-            if r.id.lower() in query_lower or r.id.lower().replace("-", " ") in query_lower:
-                robot_ids.append(r.id)
-                task_info = "No active task"
-                if r.current_task:
-                    task_info = f"{r.current_task.task_type} to {r.current_task.to_station}"
-                    if r.current_task.eta_seconds:
-                        task_info += f" (ETA: {r.current_task.eta_seconds:.0f}s)"
-
-                response = (
-                    f"## 📍 {r.id} Location\n\n"
-                    f"**{r.id}** ({r.vendor} {r.model}) is at position "
-                    f"({r.position.x:.1f}, {r.position.y:.1f}) in **{r.zone}**.\n\n"
-                    f"| Metric | Value |\n|--------|-------|\n"
-                    f"| Status | {r.status.value} |\n"
-                    f"| Battery | {r.battery:.0f}% |\n"
-                    f"| Speed | {r.speed:.1f} m/s |\n"
-                    f"| Current task | {task_info} |\n"
-                )
-                # Proactive insights
-                if r.battery < 20:
-                    response += f"\n⚠️ **Battery Warning**: {r.id} is at {r.battery:.0f}% — consider sending to charging."
-                if r.status == RobotStatus.ERROR and r.last_error:
-                    response += f"\n🔴 **Active Error**: {r.last_error.error_code} — {r.last_error.name}"
-
-                followups = [
-                    f"What task is {r.id} doing?",
-                    f"Show me {r.id}'s error history",
-                    f"Send {r.id} to charging",
-                ]
-                return {"response": response, "robot_ids": robot_ids, "suggested_followups": followups, "response_type": "status"}
-
-        # Generic "where" for zones
-        if "zone" in query_lower:
-            for zone in ["zone a", "zone b", "zone c", "zone d", "zone e", "zone f"]:
-                if zone in query_lower:
-                    zone_name = zone.title()
-                    zone_robots = [r for r in robots if r.zone == zone_name]
-                    if zone_robots:
-                        lines = [f"## 🗺️ {zone_name}\n\n**{len(zone_robots)} robots** currently in {zone_name}:\n"]
-                        lines.append("| Robot | Vendor | Status | Battery | Task |")
-                        lines.append("|-------|--------|--------|---------|------|")
-                        for r in zone_robots:
-                            robot_ids.append(r.id)
-                            task = r.current_task.task_type if r.current_task else "—"
-                            lines.append(f"| `{r.id}` | {r.vendor} | {r.status.value} | {r.battery:.0f}% | {task} |")
-                        return {
-                            "response": "\n".join(lines),
-                            "robot_ids": robot_ids,
-                            "suggested_followups": [
-                                f"Are there any errors in {zone_name}?",
-                                f"What's the activity level in {zone_name}?",
-                                "Which zone has the most robots?",
-                            ],
-                            "response_type": "status",
-                        }
-
-    # ── Comparison / Analysis queries ──
-    if any(kw in query_lower for kw in ["compare", "vs", "versus", "comparison", "better", "which vendor"]):
-        raw_robots = list(simulator.robots.values())
-        vendor_groups: dict[str, list] = {"Amazon Normal": [], "Balyo": [], "Amazon Internal": []}
-        for r in raw_robots:
-            vendor_groups[r.vendor].append(r)
-
-        lines = ["## 📊 Vendor Performance Comparison\n"]
-        lines.append("| Metric | Amazon Normal | Balyo | Amazon Internal |")
-        lines.append("|--------|--------------|-------|-----------------|")
-
-        data: dict[str, dict] = {}
-        for vendor, group in vendor_groups.items():
-            if not group:
-                continue
-            tasks = sum(r.tasks_completed for r in group)
-            in_progress = sum(1 for r in group if r.task and r.status == RobotStatus.ACTIVE)
-            errors = sum(len(r.error_history) for r in group)
-            avg_batt = sum(r.battery for r in group) / len(group)
-            active = sum(1 for r in group if r.status == RobotStatus.ACTIVE)
-            idle = sum(1 for r in group if r.status == RobotStatus.IDLE)
-            charging = sum(1 for r in group if r.status == RobotStatus.CHARGING)
-            error_count = sum(1 for r in group if r.status == RobotStatus.ERROR)
-            total_dist = sum(r.total_distance for r in group) * 0.025  # grid to km
-            data[vendor] = {
-                "tasks": tasks,
-                "tasks_per_robot": round(tasks / len(group), 1),
-                "in_progress": in_progress,
-                "errors": errors,
-                "avg_battery": round(avg_batt, 0),
-                "active": active,
-                "idle": idle,
-                "charging": charging,
-                "error_status": error_count,
-                "count": len(group),
-                "distance_km": round(total_dist, 1),
-            }
-
-        an = data.get("Amazon Normal", {})
-        ba = data.get("Balyo", {})
-        ai = data.get("Amazon Internal", {})
-
-        lines.append(f"| Robots | {an.get('count', 0)} | {ba.get('count', 0)} | {ai.get('count', 0)} |")
-        lines.append(f"| Tasks Completed | {an.get('tasks', 0)} | {ba.get('tasks', 0)} | {ai.get('tasks', 0)} |")
-        lines.append(f"| Tasks/Robot | {an.get('tasks_per_robot', 0)} | {ba.get('tasks_per_robot', 0)} | {ai.get('tasks_per_robot', 0)} |")
-        lines.append(f"| In Progress | {an.get('in_progress', 0)} | {ba.get('in_progress', 0)} | {ai.get('in_progress', 0)} |")
-        lines.append(f"| Distance (km) | {an.get('distance_km', 0)} | {ba.get('distance_km', 0)} | {ai.get('distance_km', 0)} |")
-        lines.append(f"| Errors | {an.get('errors', 0)} | {ba.get('errors', 0)} | {ai.get('errors', 0)} |")
-        lines.append(f"| Avg Battery | {an.get('avg_battery', 0)}% | {ba.get('avg_battery', 0)}% | {ai.get('avg_battery', 0)}% |")
-        lines.append(f"| Active | {an.get('active', 0)} | {ba.get('active', 0)} | {ai.get('active', 0)} |")
-        lines.append(f"| Idle | {an.get('idle', 0)} | {ba.get('idle', 0)} | {ai.get('idle', 0)} |")
-        lines.append(f"| Charging | {an.get('charging', 0)} | {ba.get('charging', 0)} | {ai.get('charging', 0)} |")
-
-        # Find the best performer - use tasks, but if all 0, use active robots
-        total_tasks = sum(d.get("tasks", 0) for d in data.values())
-        if total_tasks > 0:
-            best_vendor = max(data.items(), key=lambda x: x[1].get("tasks_per_robot", 0))
-            lines.append(f"\n**🏆 Top Performer:** {best_vendor[0]} with {best_vendor[1]['tasks_per_robot']} tasks/robot")
-        else:
-            best_vendor = max(data.items(), key=lambda x: x[1].get("active", 0) / max(x[1].get("count", 1), 1))
-            utilization = round(best_vendor[1].get("active", 0) / max(best_vendor[1].get("count", 1), 1) * 100)
-            lines.append(f"\n**🏆 Most Active:** {best_vendor[0]} with {utilization}% utilization ({best_vendor[1]['active']}/{best_vendor[1]['count']} active)")
-
-        worst_errors = max(data.items(), key=lambda x: x[1].get("errors", 0))
-        if worst_errors[1].get("errors", 0) > 0:
-            lines.append(f"**⚠️ Most Errors:** {worst_errors[0]} with {worst_errors[1]['errors']} total errors")
-
-        # Battery insight
-        lowest_batt = min(data.items(), key=lambda x: x[1].get("avg_battery", 100))
-        if lowest_batt[1].get("avg_battery", 100) < 40:
-            lines.append(f"**🔋 Low Battery:** {lowest_batt[0]} averaging {lowest_batt[1]['avg_battery']}% — consider charging")
+def _md_table(headers: tuple[str, ...], rows: Iterable[tuple]) -> str:
+    """Render a Markdown table; the separator row is sized to the header cells."""
+    lines = [
+        "| " + " | ".join(headers) + " |",
+        "|" + "|".join("-" * (len(h) + 2) for h in headers) + "|",
+    ]
+    lines.extend("| " + " | ".join(map(str, row)) + " |" for row in rows)
+    return "\n".join(lines)
 
-        return {
-            "response": "\n".join(lines),
-            "robot_ids": [],
-            "suggested_followups": [
-                "Which vendor has the best uptime?",
-                "Show me the top 5 performing robots",
-                "Which robots need attention?",
-            ],
-            "response_type": "analysis",
-        }
 
-    # ── Status queries ──
-    if any(kw in query_lower for kw in ["idle", "active", "error", "charging", "offline", "status"]):
-        status_filter = None
-        if "idle" in query_lower:
-            status_filter = RobotStatus.IDLE
-        elif "active" in query_lower:
-            status_filter = RobotStatus.ACTIVE
-        elif "error" in query_lower:
-            status_filter = RobotStatus.ERROR
-        elif "charging" in query_lower:
-            status_filter = RobotStatus.CHARGING
-        elif "offline" in query_lower:
-            status_filter = RobotStatus.OFFLINE
-
-        if status_filter:
-            filtered = [r for r in robots if r.status == status_filter]
-            robot_ids = [r.id for r in filtered]
-
-            lines = [f"## {status_filter.value.upper()} Robots\n\n**{len(filtered)} robots** are currently {status_filter.value}:\n"]
-            if filtered:
-                lines.append("| Robot | Vendor | Battery | Zone | Task |")
-                lines.append("|-------|--------|---------|------|------|")
-                for r in filtered:
-                    task = r.current_task.task_type if r.current_task else "—"
-                    err = ""
-                    if r.last_error and not r.last_error.resolved:
-                        err = f" ⛔ {r.last_error.error_code}"
-                    lines.append(f"| `{r.id}` | {r.vendor} | {r.battery:.0f}% | {r.zone} | {task}{err} |")
-
-                # Proactive insight
-                if status_filter == RobotStatus.IDLE and len(filtered) > 4:
-                    lines.append(f"\n💡 **Insight:** {len(filtered)} idle robots is above average. Consider assigning tasks to improve throughput.")
-                elif status_filter == RobotStatus.ERROR:
-                    lines.append(f"\n🔴 **Action Required:** {len(filtered)} robots need error resolution.")
-            else:
-                lines.append(f"No robots are currently {status_filter.value}. ✅")
+def _fallback_location(
+    query_lower: str, words: list[str], robots: list[UnifiedRobotState], simulator: FleetSimulator
+) -> dict | None:
+    """Locate a named robot, or list the robots in a named zone."""
+    robot_ids: list[str] = []
+    for r in robots:
+        rid = r.id.lower()
+        if rid in query_lower or rid.replace("-", " ") in query_lower:
+            robot_ids.append(r.id)
+            task_info = "No active task"
+            if r.current_task:
+                task_info = f"{r.current_task.task_type} to {r.current_task.to_station}"
+                if r.current_task.eta_seconds:
+                    task_info += f" (ETA: {r.current_task.eta_seconds:.0f}s)"
+
+            response = (
+                f"## 📍 {r.id} Location\n\n"
+                f"**{r.id}** ({r.vendor} {r.model}) is at position "
+                f"({r.position.x:.1f}, {r.position.y:.1f}) in **{r.zone}**.\n\n"
+                f"| Metric | Value |\n|--------|-------|\n"
+                f"| Status | {r.status.value} |\n"
+                f"| Battery | {r.battery:.0f}% |\n"
+                f"| Speed | {r.speed:.1f} m/s |\n"
+                f"| Current task | {task_info} |\n"
+            )
+            # Proactive insights
+            if r.battery < 20:
+                response += f"\n⚠️ **Battery Warning**: {r.id} is at {r.battery:.0f}% — consider sending to charging."
+            if r.status == RobotStatus.ERROR and r.last_error:
+                response += f"\n🔴 **Active Error**: {r.last_error.error_code} — {r.last_error.name}"
 
             followups = [
-                "Tell me more about one of these robots",
-                "What's the overall fleet status?",
-                "Are there any alerts right now?",
+                f"What task is {r.id} doing?",
+                f"Show me {r.id}'s error history",
+                f"Send {r.id} to charging",
             ]
-            return {"response": "\n".join(lines), "robot_ids": robot_ids, "suggested_followups": followups, "response_type": "status"}
+            return {"response": response, "robot_ids": robot_ids, "suggested_followups": followups, "response_type": "status"}
+
+    # Generic "where" for zones
+    if "zone" in query_lower:
+        for zone in ["zone a", "zone b", "zone c", "zone d", "zone e", "zone f"]:
+            if zone in query_lower:
+                zone_name = zone.title()
+                zone_robots = [r for r in robots if r.zone == zone_name]
+                if zone_robots:
+                    robot_ids.extend(r.id for r in zone_robots)
+                    lines = [
+                        f"## 🗺️ {zone_name}\n\n**{len(zone_robots)} robots** currently in {zone_name}:\n",
+                        _md_table(
+                            ("Robot", "Vendor", "Status", "Battery", "Task"),
+                            (
+                                (
+                                    f"`{r.id}`", r.vendor, r.status.value, f"{r.battery:.0f}%",
+                                    r.current_task.task_type if r.current_task else "—",
+                                )
+                                for r in zone_robots
+                            ),
+                        ),
+                    ]
+                    return {
+                        "response": "\n".join(lines),
+                        "robot_ids": robot_ids,
+                        "suggested_followups": [
+                            f"Are there any errors in {zone_name}?",
+                            f"What's the activity level in {zone_name}?",
+                            "Which zone has the most robots?",
+                        ],
+                        "response_type": "status",
+                    }
 
-        # General status
-        summary = simulator.get_fleet_summary()
-        response = (
-            f"## 🤖 Fleet Status Overview\n\n"
-            f"| Status | Count | Percentage |\n"
-            f"|--------|-------|------------|\n"
-            f"| 🟢 Active | {summary['active']} | {summary['active']/summary['total_robots']*100:.0f}% |\n"
-            f"| 🟡 Idle | {summary['idle']} | {summary['idle']/summary['total_robots']*100:.0f}% |\n"
-            f"| 🔴 Error | {summary['error']} | {summary['error']/summary['total_robots']*100:.0f}% |\n"
-            f"| 🔵 Charging | {summary['charging']} | {summary['charging']/summary['total_robots']*100:.0f}% |\n"
-            f"| ⚫ Offline | {summary['offline']} | {summary['offline']/summary['total_robots']*100:.0f}% |\n\n"
-            f"**Total:** {summary['total_robots']} robots across 3 vendors\n\n"
-        )
-        # Add fleet health indicator
-        health_pct = (summary['active'] + summary['idle'] + summary['charging']) / summary['total_robots'] * 100
-        if health_pct > 90:
-            response += "**Fleet Health:** 🟢 Excellent — fleet is operating at high capacity."
-        elif health_pct > 75:
-            response += "**Fleet Health:** 🟡 Good — minor issues detected."
-        else:
-            response += f"**Fleet Health:** 🔴 Needs Attention — {summary['error']} robots in error state."
 
-        return {
-            "response": response,
-            "robot_ids": [],
-            "suggested_followups": [
-                "Which robots have errors?",
-                "Which robots are below 20% battery?",
-                "Compare vendor performance",
-            ],
-            "response_type": "status",
-        }
+# Comparison table rows: (label, vendor stat key, unit suffix)
+_COMPARISON_METRICS = (
+    ("Robots", "count", ""),
+    ("Tasks Completed", "tasks", ""),
+    ("Tasks/Robot", "tasks_per_robot", ""),
+    ("In Progress", "in_progress", ""),
+    ("Distance (km)", "distance_km", ""),
+    ("Errors", "errors", ""),
+    ("Avg Battery", "avg_battery", "%"),
+    ("Active", "active", ""),
+    ("Idle", "idle", ""),
+    ("Charging", "charging", ""),
+)
 
-    # ── Battery queries ──
-    if any(kw in query_lower for kw in ["battery", "charge", "power", "low battery"]):
-        threshold = 20
-        # Try to extract a threshold from the query
-        for word in query_lower.split():
-            if word.endswith("%"):
-                try:
-                    threshold = int(word.replace("%", ""))
-                except ValueError:
-                    pass
-            elif word.isdigit():
-                threshold = int(word)
-
-        low_battery = [r for r in robots if r.battery < threshold]
-        low_battery.sort(key=lambda r: r.battery)
-        robot_ids = [r.id for r in low_battery]
-
-        if low_battery:
-            lines = [f"## 🔋 Low Battery Report\n\n**{len(low_battery)} robots** below {threshold}% battery:\n"]
-            lines.append("| Robot | Vendor | Battery | Status | Zone |")
-            lines.append("|-------|--------|---------|--------|------|")
-            for r in low_battery:
-                warning = " ⚠️" if r.battery < 10 else ""
-                lines.append(f"| `{r.id}` | {r.vendor} | **{r.battery:.0f}%**{warning} | {r.status.value} | {r.zone} |")
-
-            critical = [r for r in low_battery if r.battery < 10]
-            if critical:
-                lines.append(f"\n🚨 **Critical:** {len(critical)} robot(s) below 10% need immediate charging:")
-                for r in critical:
-                    lines.append(f"- `{r.id}` at {r.battery:.0f}%")
-
-            # Recommendation
-            non_charging = [r for r in low_battery if r.status != RobotStatus.CHARGING]
-            if non_charging:
-                lines.append(f"\n💡 **Recommendation:** Send {len(non_charging)} robots to charging stations to prevent downtime.")
-        else:
-            lines = [f"## 🔋 Battery Status\n\nAll robots have battery above {threshold}%. Fleet is healthy! ✅"]
 
-        return {
-            "response": "\n".join(lines),
-            "robot_ids": robot_ids,
-            "suggested_followups": [
-                "Which robot has the lowest battery?",
-                "Send low-battery robots to charging",
-                "Show me the fleet status",
-            ],
-            "response_type": "recommendation" if low_battery else "status",
+def _fallback_comparison(
+    query_lower: str, words: list[str], robots: list[UnifiedRobotState], simulator: FleetSimulator
+) -> dict | None:
+    """Side-by-side vendor performance table."""
+    data: dict[str, dict] = {}
+    for vendor, group in simulator.robots_by_vendor.items():
+        # Group the vendor's robots by status once; the status columns index into it
+        by_status: defaultdict[RobotStatus, list] = defaultdict(list)
+        for r in group:
+            by_status[r.status].append(r)
+        active_robots = by_status[RobotStatus.ACTIVE]
+
+        tasks = sum(r.tasks_completed for r in group)
+        in_progress = sum(1 for r in active_robots if r.task)
+        errors = sum(r.error_count for r in group)
+        avg_batt = sum(r.battery for r in group) / len(group)
+        active = len(active_robots)
+        idle = len(by_status[RobotStatus.IDLE])
+        charging = len(by_status[RobotStatus.CHARGING])
+        error_count = len(by_status[RobotStatus.ERROR])
+        total_dist = sum(r.total_distance for r in group) * 0.025  # grid to km
+        data[vendor] = {
+            "tasks": tasks,
+            "tasks_per_robot": round(tasks / len(group), 1),
+            "in_progress": in_progress,
+            "errors": errors,
+            "avg_battery": round(avg_batt, 0),
+            "active": active,
+            "idle": idle,
+            "charging": charging,
+            "error_status": error_count,
+            "count": len(group),
+            "distance_km": round(total_dist, 1),
         }
 
-    # ── Performance queries ──
-    if any(kw in query_lower for kw in ["performance", "tasks", "completed", "best", "worst", "top", "productivity"]):
-        raw_robots = list(simulator.robots.values())
-        raw_robots.sort(key=lambda r: r.tasks_completed, reverse=True)
-
-        total = sum(r.tasks_completed for r in raw_robots)
-        lines = [f"## 🏆 Robot Performance Rankings\n\n**{total} total tasks** completed by the fleet.\n"]
-        lines.append("| Rank | Robot | Vendor | Tasks | Errors | Status |")
-        lines.append("|------|-------|--------|-------|--------|--------|")
-        for i, r in enumerate(raw_robots[:10], 1):
-            medal = "🥇" if i == 1 else ("🥈" if i == 2 else ("🥉" if i == 3 else f"{i}."))
-            errors = len(r.error_history)
-            status_icon = "🟢" if r.status == RobotStatus.ACTIVE else "🟡" if r.status == RobotStatus.IDLE else "🔴"
-            lines.append(f"| {medal} | `{r.robot_id}` | {r.vendor} | {r.tasks_completed} | {errors} | {status_icon} {r.status.value} |")
-
-        # Insight
-        top = raw_robots[0]
-        bottom = raw_robots[-1]
-        lines.append(f"\n**🌟 MVP:** `{top.robot_id}` ({top.vendor}) with {top.tasks_completed} tasks")
-        if bottom.tasks_completed < top.tasks_completed * 0.5:
-            lines.append(f"**⚠️ Underperformer:** `{bottom.robot_id}` ({bottom.vendor}) with only {bottom.tasks_completed} tasks — investigate potential issues.")
+    an = data.get("Amazon Normal", {})
+    ba = data.get("Balyo", {})
+    ai = data.get("Amazon Internal", {})
 
-        return {
-            "response": "\n".join(lines),
-            "robot_ids": [r.robot_id for r in raw_robots[:5]],
-            "suggested_followups": [
-                "Compare vendor performance",
-                "Which robot has the most errors?",
-                "Show me idle robots that could take more tasks",
-            ],
-            "response_type": "analysis",
-        }
+    lines = [
+        "## 📊 Vendor Performance Comparison\n",
+        _md_table(
+            ("Metric", "Amazon Normal", "Balyo", "Amazon Internal"),
+            (
+                (label, *(f"{d.get(key, 0)}{unit}" for d in (an, ba, ai)))
+                for label, key, unit in _COMPARISON_METRICS
+            ),
+        ),
+    ]
 
-    # ── Alert queries ──
-    if any(kw in query_lower for kw in ["alert", "alerts", "warning", "warnings", "critical", "issue", "issues"]):
-        try:
-            import main as main_module
-            if main_module.conflict_engine:
-                active_alerts = main_module.conflict_engine.get_active_alerts()
-                if active_alerts:
-                    lines = [f"## 🚨 Active Alerts\n\n**{len(active_alerts)} active alert(s):**\n"]
-
-                    critical_alerts = [a for a in active_alerts if a.severity.value == "critical"]
-                    warning_alerts = [a for a in active_alerts if a.severity.value == "warning"]
-                    info_alerts = [a for a in active_alerts if a.severity.value == "info"]
-
-                    if critical_alerts:
-                        lines.append(f"### 🔴 Critical ({len(critical_alerts)})")
-                        for a in critical_alerts:
-                            lines.append(f"- **{a.title}** — {a.description}")
-                            lines.append(f"  Robots: {', '.join(f'`{r}`' for r in a.affected_robots)}")
-                            lines.append(f"  Action: {a.suggested_action}")
-                            robot_ids.extend(a.affected_robots)
-
-                    if warning_alerts:
-                        lines.append(f"\n### 🟡 Warnings ({len(warning_alerts)})")
-                        for a in warning_alerts:
-                            lines.append(f"- **{a.title}** — {a.description}")
-                            lines.append(f"  Robots: {', '.join(f'`{r}`' for r in a.affected_robots)}")
-                            robot_ids.extend(a.affected_robots)
-
-                    if info_alerts:
-                        lines.append(f"\n### ℹ️ Info ({len(info_alerts)})")
-                        for a in info_alerts:
-                            lines.append(f"- {a.title} — {a.description}")
+    # Find the best performer - use tasks, but if all 0, use active robots
+    total_tasks = sum(d.get("tasks", 0) for d in data.values())
+    if total_tasks > 0:
+        best_vendor = max(data.items(), key=lambda x: x[1].get("tasks_per_robot", 0))
+        lines.append(f"\n**🏆 Top Performer:** {best_vendor[0]} with {best_vendor[1]['tasks_per_robot']} tasks/robot")
+    else:
+        best_vendor = max(data.items(), key=lambda x: x[1].get("active", 0) / max(x[1].get("count", 1), 1))
+        utilization = round(best_vendor[1].get("active", 0) / max(best_vendor[1].get("count", 1), 1) * 100)
+        lines.append(f"\n**🏆 Most Active:** {best_vendor[0]} with {utilization}% utilization ({best_vendor[1]['active']}/{best_vendor[1]['count']} active)")
 
-                    return {
-                        "response": "\n".join(lines),
-                        "robot_ids": list(set(robot_ids)),
-                        "suggested_followups": [
-                            "Tell me more about the critical alerts",
-                            "Which robots are involved in deadlocks?",
-                            "How can I resolve these alerts?",
-                        ],
-                        "response_type": "status",
-                    }
-                else:
-                    return {
-                        "response": "## ✅ No Active Alerts\n\nAll clear! No active alerts at this time. The fleet is operating normally.",
-                        "robot_ids": [],
-                        "suggested_followups": [
-                            "What's the fleet status?",
-                            "Show me robot performance",
-                            "Are there any low-battery robots?",
-                        ],
-                        "response_type": "status",
-                    }
-        except Exception:
-            pass
+    worst_errors = max(data.items(), key=lambda x: x[1].get("errors", 0))
+    if worst_errors[1].get("errors", 0) > 0:
+        lines.append(f"**⚠️ Most Errors:** {worst_errors[0]} with {worst_errors[1]['errors']} total errors")
 
-    # ── Zone queries ──
-    if any(kw in query_lower for kw in ["zone", "populated", "busy", "congested", "crowded"]):
-        from facility import ZONES
-        zone_data: list[tuple[str, list]] = []
-        for zone_name, bounds in ZONES.items():
-            zone_robots_list = [
-                r for r in robots
-                if bounds["x_min"] <= r.position.x <= bounds["x_max"]
-                and bounds["y_min"] <= r.position.y <= bounds["y_max"]
-            ]
-            zone_data.append((zone_name, zone_robots_list))
-
-        zone_data.sort(key=lambda x: len(x[1]), reverse=True)
-
-        lines = ["## 🗺️ Zone Occupancy Report\n"]
-        lines.append("| Zone | Robots | Active | Idle | Error | Charging |")
-        lines.append("|------|--------|--------|------|-------|----------|")
-        for zname, zrobots in zone_data:
-            active = sum(1 for r in zrobots if r.status == RobotStatus.ACTIVE)
-            idle = sum(1 for r in zrobots if r.status == RobotStatus.IDLE)
-            error = sum(1 for r in zrobots if r.status == RobotStatus.ERROR)
-            charging = sum(1 for r in zrobots if r.status == RobotStatus.CHARGING)
-            lines.append(f"| **{zname}** | {len(zrobots)} | {active} | {idle} | {error} | {charging} |")
-
-        most = zone_data[0]
-        least = zone_data[-1] if zone_data else zone_data[0]
-        lines.append(f"\n**📍 Most Populated:** {most[0]} with **{len(most[1])} robots** ({', '.join(f'`{r.id}`' for r in most[1][:5])}{'...' if len(most[1]) > 5 else ''})")
-        if least[0] != most[0]:
-            lines.append(f"**📍 Least Populated:** {least[0]} with **{len(least[1])} robots**")
-
-        # Flag congestion
-        congested = [(z, rs) for z, rs in zone_data if len(rs) >= 6]
-        if congested:
-            lines.append(f"\n⚠️ **Congestion Warning:** {', '.join(z for z, _ in congested)} {'has' if len(congested) == 1 else 'have'} high robot density. Consider redistributing tasks.")
-
-        robot_ids = [r.id for r in most[1]]
-        return {
-            "response": "\n".join(lines),
-            "robot_ids": robot_ids[:5],
-            "suggested_followups": [
-                f"What robots are in {most[0]}?",
-                "Are there any congestion alerts?",
-                "Compare vendor performance by zone",
-            ],
-            "response_type": "analysis",
-        }
+    # Battery insight
+    lowest_batt = min(data.items(), key=lambda x: x[1].get("avg_battery", 100))
+    if lowest_batt[1].get("avg_battery", 100) < 40:
+        lines.append(f"**🔋 Low Battery:** {lowest_batt[0]} averaging {lowest_batt[1]['avg_battery']}% — consider charging")
 
-    # ── Error code lookup ──
-    if any(kw in query_lower for kw in ["error", "what does", "what is", "mean", "code"]):
-        # Try to find error codes in the query
-        words = query.replace(",", " ").replace("?", " ").split()
-        for word in words:
-            err = lookup_error(word.upper())
-            if not err:
-                results = search_errors(word)
-                if results:
-                    err = results[0]
-            if err:
-                equiv = get_equivalent_errors(err.code)
-                equiv_text = ""
-                if equiv:
-                    equiv_text = "\n### Cross-Vendor Equivalents\n" + "\n".join(
-                        f"- `{e.code}` ({e.vendor}): {e.name}" for e in equiv
+    return {
+        "response": "\n".join(lines),
+        "robot_ids": [],
+        "suggested_followups": [
+            "Which vendor has the best uptime?",
+            "Show me the top 5 performing robots",
+            "Which robots need attention?",
+        ],
+        "response_type": "analysis",
+    }
+
+
+def _fallback_status(
+    query_lower: str, words: list[str], robots: list[UnifiedRobotState], simulator: FleetSimulator
+) -> dict | None:
+    """Robots in a given status, or the fleet-wide status breakdown."""
+    # One pass buckets the fleet by status for both the filtered list and the totals
+    by_status: defaultdict[RobotStatus, list[UnifiedRobotState]] = defaultdict(list)
+    for r in robots:
+        by_status[r.status].append(r)
+
+    status_filter = None
+    if "idle" in query_lower:
+        status_filter = RobotStatus.IDLE
+    elif "active" in query_lower:
+        status_filter = RobotStatus.ACTIVE
+    elif "error" in query_lower:
+        status_filter = RobotStatus.ERROR
+    elif "charging" in query_lower:
+        status_filter = RobotStatus.CHARGING
+    elif "offline" in query_lower:
+        status_filter = RobotStatus.OFFLINE
+
+    if status_filter:
+        filtered = by_status[status_filter]
+        robot_ids = [r.id for r in filtered]
+
+        lines = [f"## {status_filter.value.upper()} Robots\n\n**{len(filtered)} robots** are currently {status_filter.value}:\n"]
+        if filtered:
+            lines.append(_md_table(
+                ("Robot", "Vendor", "Battery", "Zone", "Task"),
+                (
+                    (
+                        f"`{r.id}`", r.vendor, f"{r.battery:.0f}%", r.zone,
+                        f"{r.current_task.task_type if r.current_task else '—'}"
+                        f"{f' ⛔ {r.last_error.error_code}' if r.last_error and not r.last_error.resolved else ''}",
                     )
+                    for r in filtered
+                ),
+            ))
+
+            # Proactive insight
+            if status_filter == RobotStatus.IDLE and len(filtered) > 4:
+                lines.append(f"\n💡 **Insight:** {len(filtered)} idle robots is above average. Consider assigning tasks to improve throughput.")
+            elif status_filter == RobotStatus.ERROR:
+                lines.append(f"\n🔴 **Action Required:** {len(filtered)} robots need error resolution.")
+        else:
+            lines.append(f"No robots are currently {status_filter.value}. ✅")
+
+        followups = [
+            "Tell me more about one of these robots",
+            "What's the overall fleet status?",
+            "Are there any alerts right now?",
+        ]
+        return {"response": "\n".join(lines), "robot_ids": robot_ids, "suggested_followups": followups, "response_type": "status"}
+
+    # General status
+    summary = {
+        "total_robots": len(robots),
+        "active": len(by_status[RobotStatus.ACTIVE]),
+        "idle": len(by_status[RobotStatus.IDLE]),
+        "error": len(by_status[RobotStatus.ERROR]),
+        "charging": len(by_status[RobotStatus.CHARGING]),
+        "offline": len(by_status[RobotStatus.OFFLINE]),
+    }
+    response = (
+        f"## 🤖 Fleet Status Overview\n\n"
+        f"| Status | Count | Percentage |\n"
+        f"|--------|-------|------------|\n"
+        f"| 🟢 Active | {summary['active']} | {summary['active']/summary['total_robots']*100:.0f}% |\n"
+        f"| 🟡 Idle | {summary['idle']} | {summary['idle']/summary['total_robots']*100:.0f}% |\n"
+        f"| 🔴 Error | {summary['error']} | {summary['error']/summary['total_robots']*100:.0f}% |\n"
+        f"| 🔵 Charging | {summary['charging']} | {summary['charging']/summary['total_robots']*100:.0f}% |\n"
+        f"| ⚫ Offline | {summary['offline']} | {summary['offline']/summary['total_robots']*100:.0f}% |\n\n"
+        f"**Total:** {summary['total_robots']} robots across 3 vendors\n\n"
+    )
+    # Add fleet health indicator
+    health_pct = (summary['active'] + summary['idle'] + summary['charging']) / summary['total_robots'] * 100
+    if health_pct > 90:
+        response += "**Fleet Health:** 🟢 Excellent — fleet is operating at high capacity."
+    elif health_pct > 75:
+        response += "**Fleet Health:** 🟡 Good — minor issues detected."
+    else:
+        response += f"**Fleet Health:** 🔴 Needs Attention — {summary['error']} robots in error state."
 
-                response = (
-                    f"## 🔍 Error: {err.code}\n\n"
-                    f"**{err.name}** | {err.vendor} | Severity: **{err.severity.value}**\n\n"
-                    f"### What It Means\n{err.description}\n\n"
-                    f"### Common Causes\n" + "\n".join(f"- {c}" for c in err.common_causes) + "\n\n"
-                    f"### How to Fix\n" + "\n".join(f"{i+1}. {s}" for i, s in enumerate(err.remediation_steps))
-                    + "\n\n"
-                    f"Auto-recoverable: {'✅ Yes' if err.auto_recoverable else '❌ No — manual intervention required'}"
-                    + equiv_text
+    return {
+        "response": response,
+        "robot_ids": [],
+        "suggested_followups": [
+            "Which robots have errors?",
+            "Which robots are below 20% battery?",
+            "Compare vendor performance",
+        ],
+        "response_type": "status",
+    }
+
+
+# A whole word of digits, optionally with a trailing "%" ("30", "30%", "30%?").
+# Digits inside IDs such as "ar-003" are not thresholds.
+_THRESHOLD_RE = re.compile(r"(?<![^\s,?])(\d+)%?(?![^\s,?])")
+
+
+def _fallback_battery(
+    query_lower: str, words: list[str], robots: list[UnifiedRobotState], simulator: FleetSimulator
+) -> dict | None:
+    """Robots below a battery threshold (20% unless the query gives one)."""
+    threshold = 20
+    # Try to extract a threshold from the query; the last number given wins
+    numbers = _THRESHOLD_RE.findall(query_lower)
+    if numbers:
+        threshold = int(numbers[-1])
+
+    low_battery = [r for r in robots if r.battery < threshold]
+    low_battery.sort(key=lambda r: r.battery)
+    robot_ids = [r.id for r in low_battery]
+
+    if low_battery:
+        lines = [f"## 🔋 Low Battery Report\n\n**{len(low_battery)} robots** below {threshold}% battery:\n"]
+        lines.append(_md_table(
+            ("Robot", "Vendor", "Battery", "Status", "Zone"),
+            (
+                (
+                    f"`{r.id}`", r.vendor, f"**{r.battery:.0f}%**{' ⚠️' if r.battery < 10 else ''}",
+                    r.status.value, r.zone,
                 )
+                for r in low_battery
+            ),
+        ))
+
+        critical = [r for r in low_battery if r.battery < 10]
+        if critical:
+            lines.append(f"\n🚨 **Critical:** {len(critical)} robot(s) below 10% need immediate charging:")
+            lines.extend(f"- `{r.id}` at {r.battery:.0f}%" for r in critical)
+
+        # Recommendation
+        non_charging = [r for r in low_battery if r.status != RobotStatus.CHARGING]
+        if non_charging:
+            lines.append(f"\n💡 **Recommendation:** Send {len(non_charging)} robots to charging stations to prevent downtime.")
+    else:
+        lines = [f"## 🔋 Battery Status\n\nAll robots have battery above {threshold}%. Fleet is healthy! ✅"]
+
+    return {
+        "response": "\n".join(lines),
+        "robot_ids": robot_ids,
+        "suggested_followups": [
+            "Which robot has the lowest battery?",
+            "Send low-battery robots to charging",
+            "Show me the fleet status",
+        ],
+        "response_type": "recommendation" if low_battery else "status",
+    }
+
+
+_RANK_MEDALS = {1: "🥇", 2: "🥈", 3: "🥉"}
+_STATUS_ICONS = {RobotStatus.ACTIVE: "🟢", RobotStatus.IDLE: "🟡"}
+_tasks_completed = attrgetter("tasks_completed")
+_robot_id = attrgetter("robot_id")
+
+
+def _fallback_performance(
+    query_lower: str, words: list[str], robots: list[UnifiedRobotState], simulator: FleetSimulator
+) -> dict | None:
+    """Top-10 robots by completed tasks."""
+    raw_robots = sorted(simulator.robots.values(), key=_tasks_completed, reverse=True)
+
+    total = sum(map(_tasks_completed, raw_robots))
+    lines = [f"## 🏆 Robot Performance Rankings\n\n**{total} total tasks** completed by the fleet.\n"]
+    lines.append(_md_table(
+        ("Rank", "Robot", "Vendor", "Tasks", "Errors", "Status"),
+        (
+            (
+                _RANK_MEDALS.get(i, f"{i}."), f"`{r.robot_id}`", r.vendor, r.tasks_completed,
+                r.error_count, f"{_STATUS_ICONS.get(r.status, '🔴')} {r.status.value}",
+            )
+            for i, r in enumerate(raw_robots[:10], 1)
+        ),
+    ))
+
+    # Insight
+    top = raw_robots[0]
+    bottom = raw_robots[-1]
+    lines.append(f"\n**🌟 MVP:** `{top.robot_id}` ({top.vendor}) with {top.tasks_completed} tasks")
+    if bottom.tasks_completed < top.tasks_completed * 0.5:
+        lines.append(f"**⚠️ Underperformer:** `{bottom.robot_id}` ({bottom.vendor}) with only {bottom.tasks_completed} tasks — investigate potential issues.")
 
-                # Check if any robot currently has this error
-                affected = [r for r in robots if r.last_error and r.last_error.error_code == err.code and not r.last_error.resolved]
-                if affected:
-                    response += f"\n\n### Currently Affected Robots\n"
-                    for r in affected:
-                        response += f"- `{r.id}` ({r.vendor}) in {r.zone}\n"
-                        robot_ids.append(r.id)
+    return {
+        "response": "\n".join(lines),
+        "robot_ids": list(map(_robot_id, raw_robots[:5])),
+        "suggested_followups": [
+            "Compare vendor performance",
+            "Which robot has the most errors?",
+            "Show me idle robots that could take more tasks",
+        ],
+        "response_type": "analysis",
+    }
+
+
+def _fallback_alerts(
+    query_lower: str, words: list[str], robots: list[UnifiedRobotState], simulator: FleetSimulator
+) -> dict | None:
+    """Active alerts grouped by severity."""
+    robot_ids: list[str] = []
+    try:
+        main_module = _main_module()
+        if main_module.conflict_engine:
+            active_alerts = main_module.conflict_engine.get_active_alerts()
+            if active_alerts:
+                lines = [f"## 🚨 Active Alerts\n\n**{len(active_alerts)} active alert(s):**\n"]
+
+                by_severity: defaultdict[AlertSeverity, list] = defaultdict(list)
+                for a in active_alerts:
+                    by_severity[a.severity].append(a)
+                critical_alerts = by_severity[AlertSeverity.CRITICAL]
+                warning_alerts = by_severity[AlertSeverity.WARNING]
+                info_alerts = by_severity[AlertSeverity.INFO]
+
+                if critical_alerts:
+                    lines.append(f"### 🔴 Critical ({len(critical_alerts)})")
+                    for a in critical_alerts:
+                        lines.append(f"- **{a.title}** — {a.description}")
+                        lines.append(f"  Robots: {', '.join(f'`{r}`' for r in a.affected_robots)}")
+                        lines.append(f"  Action: {a.suggested_action}")
+                        robot_ids.extend(a.affected_robots)
+
+                if warning_alerts:
+                    lines.append(f"\n### 🟡 Warnings ({len(warning_alerts)})")
+                    for a in warning_alerts:
+                        lines.append(f"- **{a.title}** — {a.description}")
+                        lines.append(f"  Robots: {', '.join(f'`{r}`' for r in a.affected_robots)}")
+                        robot_ids.extend(a.affected_robots)
+
+                if info_alerts:
+                    lines.append(f"\n### ℹ️ Info ({len(info_alerts)})")
+                    for a in info_alerts:
+                        lines.append(f"- {a.title} — {a.description}")
 
                 return {
-                    "response": response,
-                    "robot_ids": robot_ids,
+                    "response": "\n".join(lines),
+                    "robot_ids": list(dict.fromkeys(robot_ids)),
+                    "suggested_followups": [
+                        "Tell me more about the critical alerts",
+                        "Which robots are involved in deadlocks?",
+                        "How can I resolve these alerts?",
+                    ],
+                    "response_type": "status",
+                }
+            else:
+                return {
+                    "response": "## ✅ No Active Alerts\n\nAll clear! No active alerts at this time. The fleet is operating normally.",
+                    "robot_ids": [],
                     "suggested_followups": [
-                        "Which robots have this error right now?",
-                        f"Show me related errors to {err.code}",
-                        "What are the most common errors today?",
+                        "What's the fleet status?",
+                        "Show me robot performance",
+                        "Are there any low-battery robots?",
                     ],
-                    "response_type": "error_lookup",
+                    "response_type": "status",
                 }
+    except Exception:
+        pass
+
+
+def _fallback_zones(
+    query_lower: str, words: list[str], robots: list[UnifiedRobotState], simulator: FleetSimulator
+) -> dict | None:
+    """Zone occupancy table with congestion flags."""
+    zone_buckets: dict[str, list] = {zone_name: [] for zone_name in ZONES}
+    for r in robots:
+        if r.zone in zone_buckets:
+            zone_buckets[r.zone].append(r)
+    # (zone, robots, robot count), busiest first
+    zone_data: list[tuple[str, list, int]] = sorted(
+        ((zname, zrobots, len(zrobots)) for zname, zrobots in zone_buckets.items()),
+        key=itemgetter(2),
+        reverse=True,
+    )
 
-    # ── "Tell me more about a robot" handler ──
-    robot_curiosity_kw = [
-        "tell me more", "tell me about", "show me a robot", "pick a robot",
-        "describe a robot", "random robot", "spotlight", "highlight a robot",
-        "interesting robot", "one of these robots", "about a robot",
-        "tell me about one", "more about one",
+    rows = []
+    for zname, zrobots, zcount in zone_data:
+        counts = Counter(r.status for r in zrobots)
+        rows.append((
+            f"**{zname}**", zcount, counts[RobotStatus.ACTIVE], counts[RobotStatus.IDLE],
+            counts[RobotStatus.ERROR], counts[RobotStatus.CHARGING],
+        ))
+    lines = [
+        "## 🗺️ Zone Occupancy Report\n",
+        _md_table(("Zone", "Robots", "Active", "Idle", "Error", "Charging"), rows),
     ]
-    if any(kw in query_lower for kw in robot_curiosity_kw):
-        import random
-
-        # Prioritise interesting robots: error > active task > low battery > random
-        error_bots = [r for r in robots if r.status == RobotStatus.ERROR or (r.last_error and not r.last_error.resolved)]
-        active_bots = [r for r in robots if r.current_task is not None]
-        low_batt = [r for r in robots if r.battery < 30]
-
-        if error_bots:
-            pick = random.choice(error_bots)
-        elif active_bots:
-            pick = random.choice(active_bots)
-        elif low_batt:
-            pick = random.choice(low_batt)
-        else:
-            pick = random.choice(robots)
-
-        sim_robot = simulator.robots.get(pick.id)
-        tasks_done = sim_robot.tasks_completed if sim_robot else 0
-        total_dist = (sim_robot.total_distance * 0.025) if sim_robot else 0
-        err_count = len(sim_robot.error_history) if sim_robot else 0
-
-        response = f"## Robot Spotlight: `{pick.id}`\n\n"
-        response += f"| Field | Detail |\n|-------|--------|\n"
-        response += f"| **Vendor** | {pick.vendor} |\n"
-        response += f"| **Model** | {pick.model} |\n"
-        response += f"| **Status** | {pick.status.value.upper()} |\n"
-        response += f"| **Battery** | {pick.battery:.0f}% |\n"
-        response += f"| **Zone** | {pick.zone} |\n"
-        response += f"| **Position** | ({pick.position.x:.1f}, {pick.position.y:.1f}) |\n"
-        response += f"| **Speed** | {pick.speed:.1f} m/s |\n"
-        response += f"| **Tasks Done** | {tasks_done} |\n"
-        response += f"| **Distance** | {total_dist:.2f} km |\n"
-        response += f"| **Errors Today** | {err_count} |\n\n"
-
-        if pick.current_task:
-            t = pick.current_task
-            eta = f" (ETA: {t.eta_seconds:.0f}s)" if t.eta_seconds else ""
-            response += f"### Current Task\n"
-            response += f"**{t.task_type}** — {t.from_station} → {t.to_station}{eta}\n\n"
-
-        if pick.last_error:
-            e = pick.last_error
-            resolved_tag = " ✅ Resolved" if e.resolved else " ⚠️ Active"
-            response += f"### Last Error\n"
-            response += f"`{e.error_code}` — {e.name}{resolved_tag}\n"
-            response += f"{e.description}\n\n"
-
-        if pick.recent_activity:
-            response += f"### Recent Activity\n"
-            for act in pick.recent_activity[-5:]:
-                response += f"- {act.description}\n"
+
+    most_name, most_robots, most_count = zone_data[0]
+    least_name, _, least_count = zone_data[-1]
+    lines.append(f"\n**📍 Most Populated:** {most_name} with **{most_count} robots** ({', '.join(f'`{r.id}`' for r in most_robots[:5])}{'...' if most_count > 5 else ''})")
+    if least_name != most_name:
+        lines.append(f"**📍 Least Populated:** {least_name} with **{least_count} robots**")
+
+    # Flag congestion
+    congested = [z for z, _, count in zone_data if count >= 6]
+    if congested:
+        lines.append(f"\n⚠️ **Congestion Warning:** {', '.join(congested)} {'has' if len(congested) == 1 else 'have'} high robot density. Consider redistributing tasks.")
+
+    return {
+        "response": "\n".join(lines),
+        "robot_ids": [r.id for r in most_robots[:5]],
+        "suggested_followups": [
+            f"What robots are in {most_name}?",
+            "Are there any congestion alerts?",
+            "Compare vendor performance by zone",
+        ],
+        "response_type": "analysis",
+    }
+
+
+def _fallback_error_code(
+    query_lower: str, words: list[str], robots: list[UnifiedRobotState], simulator: FleetSimulator
+) -> dict | None:
+    """Explain an error code (or the best KB match) named in the query."""
+    robot_ids: list[str] = []
+    # An exact error code anywhere in the query wins; only when there is none
+    # do we fall back to a knowledge-base search on each word in turn
+    err = next(filter(None, map(find_error_code, words)), None)
+    if err is None:
+        for word in words:
+            results = search_errors(word)
+            if results:
+                err = results[0]
+                break
+    if err:
+        equiv = get_equivalent_errors(err.code)
+        equiv_text = ""
+        if equiv:
+            equiv_text = "\n### Cross-Vendor Equivalents\n" + "\n".join(
+                f"- `{e.code}` ({e.vendor}): {e.name}" for e in equiv
+            )
+
+        response = (
+            f"## 🔍 Error: {err.code}\n\n"
+            f"**{err.name}** | {err.vendor} | Severity: **{err.severity.value}**\n\n"
+            f"### What It Means\n{err.description}\n\n"
+            f"### Common Causes\n" + "\n".join(f"- {c}" for c in err.common_causes) + "\n\n"
+            f"### How to Fix\n" + "\n".join(f"{i+1}. {s}" for i, s in enumerate(err.remediation_steps))
+            + "\n\n"
+            f"Auto-recoverable: {'✅ Yes' if err.auto_recoverable else '❌ No — manual intervention required'}"
+            + equiv_text
+        )
+
+        # Check if any robot currently has this error
+        affected = [r for r in robots if r.last_error and r.last_error.error_code == err.code and not r.last_error.resolved]
+        if affected:
+            response += "\n\n### Currently Affected Robots\n" + "".join(
+                f"- `{r.id}` ({r.vendor}) in {r.zone}\n" for r in affected
+            )
+            robot_ids.extend(r.id for r in affected)
 
         return {
             "response": response,
-            "robot_ids": [pick.id],
+            "robot_ids": robot_ids,
             "suggested_followups": [
-                f"What errors has {pick.id} had today?",
-                f"Compare {pick.id} with other {pick.vendor} robots",
-                "Tell me about another robot",
+                "Which robots have this error right now?",
+                f"Show me related errors to {err.code}",
+                "What are the most common errors today?",
             ],
-            "response_type": "status",
+            "response_type": "error_lookup",
         }
 
-    # ── Default fallback ──
+
+def _fallback_spotlight(
+    query_lower: str, words: list[str], robots: list[UnifiedRobotState], simulator: FleetSimulator
+) -> dict | None:
+    """Spotlight one robot, preferring errored, busy, then low-battery ones."""
+    # Prioritise interesting robots: error > active task > low battery > random
+    error_bots = [r for r in robots if r.status == RobotStatus.ERROR or (r.last_error and not r.last_error.resolved)]
+    active_bots = [r for r in robots if r.current_task is not None]
+    low_batt = [r for r in robots if r.battery < 30]
+
+    if error_bots:
+        pick = random.choice(error_bots)
+    elif active_bots:
+        pick = random.choice(active_bots)
+    elif low_batt:
+        pick = random.choice(low_batt)
+    else:
+        pick = random.choice(robots)
+
+    sim_robot = simulator.robots.get(pick.id)
+    tasks_done = sim_robot.tasks_completed if sim_robot else 0
+    total_dist = (sim_robot.total_distance * 0.025) if sim_robot else 0
+    err_count = sim_robot.error_count if sim_robot else 0
+
+    response = f"## Robot Spotlight: `{pick.id}`\n\n"
+    response += f"| Field | Detail |\n|-------|--------|\n"
+    response += f"| **Vendor** | {pick.vendor} |\n"
+    response += f"| **Model** | {pick.model} |\n"
+    response += f"| **Status** | {pick.status.value.upper()} |\n"
+    response += f"| **Battery** | {pick.battery:.0f}% |\n"
+    response += f"| **Zone** | {pick.zone} |\n"
+    response += f"| **Position** | ({pick.position.x:.1f}, {pick.position.y:.1f}) |\n"
+    response += f"| **Speed** | {pick.speed:.1f} m/s |\n"
+    response += f"| **Tasks Done** | {tasks_done} |\n"
+    response += f"| **Distance** | {total_dist:.2f} km |\n"
+    response += f"| **Errors Today** | {err_count} |\n\n"
+
+    if pick.current_task:
+        t = pick.current_task
+        eta = f" (ETA: {t.eta_seconds:.0f}s)" if t.eta_seconds else ""
+        response += f"### Current Task\n"
+        response += f"**{t.task_type}** — {t.from_station} → {t.to_station}{eta}\n\n"
+
+    if pick.last_error:
+        e = pick.last_error
+        resolved_tag = " ✅ Resolved" if e.resolved else " ⚠️ Active"
+        response += f"### Last Error\n"
+        response += f"`{e.error_code}` — {e.name}{resolved_tag}\n"
+        response += f"{e.description}\n\n"
+
+    if pick.recent_activity:
+        response += f"### Recent Activity\n"
+        for act in pick.recent_activity[-5:]:
+            response += f"- {act.description}\n"
+
+    return {
+        "response": response,
+        "robot_ids": [pick.id],
+        "suggested_followups": [
+            f"What errors has {pick.id} had today?",
+            f"Compare {pick.id} with other {pick.vendor} robots",
+            "Tell me about another robot",
+        ],
+        "response_type": "status",
+    }
+
+
+def _fallback_overview(simulator: FleetSimulator) -> dict:
+    """Fleet overview plus examples of what the assistant can answer."""
     summary = simulator.get_fleet_summary()
     total_tasks = sum(r.tasks_completed for r in simulator.robots.values())
-    total_errors = sum(len(r.error_history) for r in simulator.robots.values())
+    total_errors = sum(r.error_count for r in simulator.robots.values())
 
     response = (
         f"## 🤖 FleetBridge AI\n\n"
@@ -1074,6 +1286,48 @@ def _generate_fallback_response(query: str, simulator: FleetSimulator) -> dict:
     }
 
 
+# Fallback intents in priority order: the first handler whose keywords occur in
+# the query and that produces an answer wins; otherwise the overview is shown.
+_FALLBACK_HANDLERS: list[tuple[re.Pattern[str], Callable[..., dict | None]]] = [
+    (_keyword_re("where is", "where's", "location of", "find"), _fallback_location),
+    (_keyword_re("compare", "vs", "versus", "comparison", "better", "which vendor"), _fallback_comparison),
+    (_keyword_re("idle", "active", "error", "charging", "offline", "status"), _fallback_status),
+    (_keyword_re("battery", "charge", "power", "low battery"), _fallback_battery),
+    (
+        _keyword_re(
+            "performance", "tasks", "completed", "best", "worst", "top", "productivity",
+        ),
+        _fallback_performance,
+    ),
+    (_keyword_re("alert", "alerts", "warning", "warnings", "critical", "issue", "issues"), _fallback_alerts),
+    (_keyword_re("zone", "populated", "busy", "congested", "crowded"), _fallback_zones),
+    (_keyword_re("error", "what does", "what is", "mean", "code"), _fallback_error_code),
+    (
+        _keyword_re(
+            "tell me more", "tell me about", "show me a robot", "pick a robot",
+            "describe a robot", "random robot", "spotlight", "highlight a robot",
+            "interesting robot", "one of these robots", "about a robot", "tell me about one",
+            "more about one",
+        ),
+        _fallback_spotlight,
+    ),
+]
+
+
+def _generate_fallback_response(query_lower: str, words: list[str], simulator: FleetSimulator) -> dict:
+    """Generate a comprehensive response locally when Gemini is unavailable.
+
+    Takes the query already lowercased and split into words by process_query.
+    """
+    robots = simulator.get_all_unified()
+    for pattern, handler in _FALLBACK_HANDLERS:
+        if pattern.search(query_lower):
+            response = handler(query_lower, words, robots, simulator)
+            if response is not None:
+                return response
+    return _fallback_overview(simulator)
+
+
 # ────────────────────────────────────────────────────────
 #  Natural-Language Task Assignment
 # ────────────────────────────────────────────────────────
@@ -1118,15 +1372,23 @@ Rules:
 Respond with ONLY the JSON object, no markdown or extra text."""
 
 
+@lru_cache(maxsize=8)
+def _task_prompt_fragments(vendor: str) -> tuple[str, str, str, str]:
+    """Static prompt lists for a vendor: (task_list, station_list, charger_list, zone_list)."""
+    # Only tasks this vendor can do
+    task_lines = "\n".join(
+        f"  - id: \"{t.id}\" | name: \"{t.name}\" | category: {t.category} | description: {t.description}"
+        for t in get_tasks_for_vendor(vendor)
+    )
+    return task_lines, ", ".join(STATIONS), ", ".join(CHARGING_STATIONS), ", ".join(ZONES)
+
+
 async def parse_nl_task(
     instruction: str,
     robot_id: str,
     simulator: FleetSimulator,
 ) -> dict:
     """Parse a natural-language task instruction into structured task parameters using the LLM."""
-    from task_catalog import TASK_CATALOG, get_tasks_for_vendor
-    from facility import STATIONS, CHARGING_STATIONS, ZONES
-
     robot = simulator.get_robot_unified(robot_id)
     if not robot:
         return {
@@ -1134,16 +1396,8 @@ async def parse_nl_task(
             "error": f"Robot {robot_id} not found",
         }
 
-    # Build task list for the prompt (only tasks this vendor can do)
     vendor_tasks = get_tasks_for_vendor(robot.vendor)
-    task_lines = "\n".join(
-        f"  - id: \"{t.id}\" | name: \"{t.name}\" | category: {t.category} | description: {t.description}"
-        for t in vendor_tasks
-    )
-
-    station_names = ", ".join(STATIONS.keys())
-    charger_names = ", ".join(CHARGING_STATIONS.keys())
-    zone_names = ", ".join(ZONES.keys())
+    task_lines, station_names, charger_names, zone_names = _task_prompt_fragments(robot.vendor)
 
     prompt = TASK_PARSE_PROMPT.format(
         task_list=task_lines,
@@ -1163,12 +1417,14 @@ async def parse_nl_task(
     # Try LLM
     parsed = None
     try:
-        import google.generativeai as genai
-
         api_key = os.getenv("GEMINI_API_KEY", "")
         if not api_key:
             raise ValueError("No API key")
 
+        genai = _genai_module()
+        if genai is None:
+            raise ImportError("google-generativeai is not installed")
+
         genai.configure(api_key=api_key)
         model = genai.GenerativeModel("gemini-2.0-flash")
         response = await model.generate_content_async(prompt)
@@ -1176,16 +1432,16 @@ async def parse_nl_task(
 
         # Extract JSON
         if "```json" in text:
-            text = text.split("```json")[1].split("```")[0].strip()
+            text = text.partition("```json")[2].partition("```")[0].strip()
         elif "```" in text:
-            text = text.split("```")[1].split("```")[0].strip()
+            text = text.partition("```")[2].partition("```")[0].strip()
 
         parsed = json.loads(text)
     except Exception:
-        # Fallback: keyword-based matching
-        parsed = _fallback_parse_task(instruction, robot, vendor_tasks)
+        parsed = None
 
     if not parsed:
+        # Fallback: keyword-based matching
         parsed = _fallback_parse_task(instruction, robot, vendor_tasks)
 
     return {
@@ -1202,21 +1458,22 @@ async def parse_nl_task(
 def _fallback_parse_task(
     instruction: str,
     robot: "UnifiedRobotState",
-    vendor_tasks: list,
+    vendor_tasks: tuple[TaskDef, ...],
 ) -> dict:
     """Keyword-based fallback when LLM is unavailable."""
-    from facility import STATIONS, CHARGING_STATIONS, ZONES
     instruction_lower = instruction.lower()
 
-    # Try to match a catalog task by keyword
+    # Try to match a catalog task by keyword: each distinct catalog keyword is
+    # tested against the instruction once and credited to every task using it
+    scores: Counter = Counter()
+    for kw, weights in TASK_KEYWORDS.items():
+        if kw in instruction_lower:
+            scores.update(weights)
+
     best_task = None
     best_score = 0
     for t in vendor_tasks:
-        score = 0
-        keywords = t.name.lower().split() + t.description.lower().split() + t.category.lower().split()
-        for kw in keywords:
-            if len(kw) > 3 and kw in instruction_lower:
-                score += 1
+        score = scores[t.id]
         if score > best_score:
             best_score = score
             best_task = t
@@ -1237,23 +1494,15 @@ def _fallback_parse_task(
                 to_station = name
 
     # Try to match zones and find nearest station
-    for zone_name, bounds in ZONES.items():
+    for zone_name, nearest in ZONE_NEAREST_STATION.items():
         if zone_name.lower() in instruction_lower:
-            # Find station nearest to zone center
-            cx = (bounds["x_min"] + bounds["x_max"]) / 2
-            cy = (bounds["y_min"] + bounds["y_max"]) / 2
-            nearest = min(
-                STATIONS.items(),
-                key=lambda s: (s[1].x - cx) ** 2 + (s[1].y - cy) ** 2,
-            )
             if to_station is None:
-                to_station = nearest[0]
+                to_station = nearest
             elif from_station is None:
-                from_station = nearest[0]
+                from_station = nearest
 
     # Check for charging keywords
     if any(kw in instruction_lower for kw in ["charge", "charging", "battery", "recharge"]):
-        from facility import get_nearest_charging_station
         charger_name, _, _ = get_nearest_charging_station(robot.position.x, robot.position.y)
         return {
             "catalog_task_id": None,
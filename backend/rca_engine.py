@@ -7,30 +7,139 @@ Uses Gemini for intelligent analysis when available, falls back to rule-based.
 
 from __future__ import annotations
 
+import asyncio
 import json
 import os
+from collections import OrderedDict
 from datetime import datetime
+from itertools import islice
+from operator import itemgetter
 from typing import Optional
 
 from models import (
     Alert,
     AlertSeverity,
     AlertType,
-    Position,
     RobotStatus,
     UnifiedRobotState,
+    to_iso,
 )
-from simulator import FleetSimulator, RawRobot
-from error_kb import lookup_error, get_equivalent_errors
-from facility import get_zone_for_position, distance, get_nearest_charging_station
+from simulator import ERROR_CELL_SIZE, FleetSimulator, RawRobot
+from error_kb import lookup_error_doc, get_equivalent_errors
+from facility import get_zone_for_position, get_nearest_charging_station
+
+# Gemini RCA calls allowed in flight at once
+GEMINI_CONCURRENCY = 10
+# Error instances remembered as already analyzed (oldest forgotten first)
+ANALYZED_LIMIT = 4096
+# Robots within this distance of the failed robot are reported as nearby
+NEARBY_RADIUS = 15
+# An idle or errored robot closer than this is reported as blocking the path
+BLOCKER_DISTANCE = 3
+# Errors closer than this on both axes count as "the same location". The
+# location index buckets errors by their recorded cell, so the radius must not
+# exceed the cell size.
+SAME_LOCATION_RADIUS = ERROR_CELL_SIZE
+
+# (order in the fleet-wide history, robot_id, error record)
+ErrorRef = tuple[int, str, dict]
+
+
+RCA_PROMPT = """You are analyzing a robot fleet error. Provide a concise root cause analysis.
+
+AFFECTED ROBOT:
+- ID: {robot_id}
+- Vendor: {vendor}
+- Position: {position} in {zone}
+- Battery: {battery}%
+- Error: {error_json}
+- Current Task: {task_json}
+
+ERROR DOCUMENTATION:
+{error_doc_json}
+
+NEARBY ROBOTS (within 15m):
+{nearby_json}
+
+HISTORICAL DATA:
+- Errors at this location: {same_location_json}
+- This robot's error history: {same_robot_json}
+- Nearest charger: {charger_name} ({charger_distance}m away)
+
+Provide analysis in this exact format:
+
+WHAT HAPPENED:
+[1-2 sentences describing the event]
+
+WHY:
+[Root cause explanation with evidence from the data]
+
+SUGGESTED FIX:
+1. [Step 1]
+2. [Step 2]
+3. [Step 3]
+
+PATTERN WARNING (if applicable):
+[Any recurring patterns detected, or "No recurring patterns detected."]"""
 
 
 class RCAEngine:
     """Performs root cause analysis on robot errors."""
 
+    # Configured Gemini model, shared by all analyses, and the API key it was built with
+    _genai_model = None
+    _genai_key: Optional[str] = None
+
     def __init__(self, simulator: FleetSimulator):
         self.simulator = simulator
-        self._analyzed: set[str] = set()  # track analyzed error instances
+        # Analyzed error instances, keyed by (robot_id, error timestamp), LRU order
+        self._analyzed: OrderedDict[tuple[str, Optional[float]], None] = OrderedDict()
+        self._gemini_slots = asyncio.Semaphore(GEMINI_CONCURRENCY)
+        # Fleet error history bucketed into SAME_LOCATION_RADIUS-sized cells,
+        # rebuilt at most once per simulator state version
+        self._error_cells: dict[tuple[int, int], list[ErrorRef]] = {}
+        self._error_cells_version = -1
+        # Unified robot states bucketed into NEARBY_RADIUS-sized cells, tagged
+        # with their fleet order; rebuilt the same way
+        self._robot_cells: dict[tuple[int, int], list[tuple[int, UnifiedRobotState]]] = {}
+        self._robot_cells_version = -1
+
+    def _robot_cell_index(self) -> dict[tuple[int, int], list[tuple[int, UnifiedRobotState]]]:
+        """Unified robot states by grid cell, shared by every analysis in a tick."""
+        if self._robot_cells_version != self.simulator.state_version:
+            cells: dict[tuple[int, int], list[tuple[int, UnifiedRobotState]]] = {}
+            for i, r in enumerate(self.simulator.get_all_unified()):
+                cell = (int(r.position.x // NEARBY_RADIUS), int(r.position.y // NEARBY_RADIUS))
+                cells.setdefault(cell, []).append((i, r))
+            self._robot_cells = cells
+            self._robot_cells_version = self.simulator.state_version
+        return self._robot_cells
+
+    def _error_cell_index(self) -> dict[tuple[int, int], list[ErrorRef]]:
+        """Error records by their grid cell, shared by every analysis in a tick."""
+        if self._error_cells_version != self.simulator.state_version:
+            cells: dict[tuple[int, int], list[ErrorRef]] = {}
+            seq = 0
+            for r in self.simulator.robots.values():
+                for err in r.error_history:
+                    cell = err.get("cell")
+                    if cell is not None:
+                        cells.setdefault(cell, []).append((seq, r.robot_id, err))
+                    seq += 1
+            self._error_cells = cells
+            self._error_cells_version = self.simulator.state_version
+        return self._error_cells
+
+    async def analyze_errors(self, robot_ids: list[str]) -> list[Optional[str]]:
+        """
+        Analyze several newly errored robots concurrently.
+        Returns one analysis (or None) per robot, in the order given.
+        """
+        results = await asyncio.gather(
+            *(self.analyze_error(robot_id) for robot_id in robot_ids),
+            return_exceptions=True,
+        )
+        return [None if isinstance(r, BaseException) else r for r in results]
 
     async def analyze_error(self, robot_id: str) -> Optional[str]:
         """
@@ -42,13 +151,16 @@ class RCAEngine:
             return None
 
         # Prevent re-analyzing the same error instance
-        error_key = f"{robot_id}:{raw_robot.last_error.get('timestamp', '') if raw_robot.last_error else ''}"
+        error_key = (robot_id, raw_robot.last_error.get("timestamp") if raw_robot.last_error else None)
         if error_key in self._analyzed:
+            self._analyzed.move_to_end(error_key)
             return None
-        self._analyzed.add(error_key)
+        self._analyzed[error_key] = None
+        if len(self._analyzed) > ANALYZED_LIMIT:
+            self._analyzed.popitem(last=False)
 
-        # Gather context
-        context = self._gather_context(raw_robot)
+        # Gather context; without a Gemini key only the rule-based fields are needed
+        context = self._gather_context(raw_robot, full=bool(os.getenv("GEMINI_API_KEY")))
 
         # Try Gemini first
         try:
@@ -58,64 +170,100 @@ class RCAEngine:
 
         return analysis
 
-    def _gather_context(self, robot: RawRobot) -> dict:
-        """Collect all data needed for analysis."""
-        all_robots = self.simulator.get_all_unified()
-        robot_pos = Position(x=robot.x, y=robot.y)
+    def _gather_context(self, robot: RawRobot, full: bool = True) -> dict:
+        """
+        Collect all data needed for analysis.
+        With full=False, fields only the Gemini prompt reads (nearby robots'
+        tasks, history names and timestamps) are left out, and only robots
+        close enough to be blockers are listed as nearby.
+        """
+        # Find nearby robots (within NEARBY_RADIUS): only the robot's own grid
+        # cell and its eight neighbours can hold one
+        radius = NEARBY_RADIUS if full else BLOCKER_DISTANCE
+        cells = self._robot_cell_index()
+        rx, ry = robot.x, robot.y
+        cx = int(rx // NEARBY_RADIUS)
+        cy = int(ry // NEARBY_RADIUS)
+        candidates: list[tuple[int, UnifiedRobotState, float]] = []
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for i, r in cells.get((cx + dx, cy + dy), ()):
+                    if r.id == robot.robot_id:
+                        continue
+                    pos = r.position
+                    ox = rx - pos.x
+                    oy = ry - pos.y
+                    d2 = ox * ox + oy * oy
+                    if d2 <= radius * radius:
+                        candidates.append((i, r, d2 ** 0.5))
+        candidates.sort(key=itemgetter(0))
 
-        # Find nearby robots (within 15 units)
         nearby = []
-        for r in all_robots:
-            if r.id == robot.robot_id:
-                continue
-            dist = distance(robot_pos, r.position)
-            if dist <= 15:
-                nearby.append({
-                    "id": r.id,
-                    "vendor": r.vendor,
-                    "position": f"({r.position.x:.1f}, {r.position.y:.1f})",
-                    "status": r.status.value,
-                    "distance": round(dist, 1),
-                    "task": r.current_task.task_id if r.current_task else "None",
-                    "idle_or_error": r.status in (RobotStatus.IDLE, RobotStatus.ERROR),
-                })
+        for _, r, dist in candidates:
+            pos = r.position
+            status = r.status
+            entry = {
+                "id": r.id,
+                "vendor": r.vendor,
+                "position": f"({pos.x:.1f}, {pos.y:.1f})",
+                "status": status.value,
+                "distance": round(dist, 1),
+                "idle_or_error": status in (RobotStatus.IDLE, RobotStatus.ERROR),
+            }
+            if full:
+                entry["task"] = r.current_task.task_id if r.current_task else "None"
+            nearby.append(entry)
 
         # Error documentation
         error_doc = None
         if robot.last_error:
-            entry = lookup_error(robot.last_error.get("error_code", ""))
-            if entry:
-                error_doc = {
-                    "code": entry.code,
-                    "name": entry.name,
-                    "description": entry.description,
-                    "common_causes": entry.common_causes,
-                    "remediation_steps": entry.remediation_steps,
-                    "severity": entry.severity.value,
-                    "auto_recoverable": entry.auto_recoverable,
-                }
+            error_doc = lookup_error_doc(robot.last_error.get("error_code", ""))
 
-        # Historical data
-        same_location_errors = []
-        same_robot_errors = []
+        # Historical data: errors within SAME_LOCATION_RADIUS can only sit in
+        # the robot's own error cell or one of its eight neighbours
         zone = get_zone_for_position(robot.x, robot.y)
-
-        for r in self.simulator.robots.values():
-            for err in r.error_history:
-                err_pos = err.get("position", {})
-                if (abs(err_pos.get("x", -999) - robot.x) < 3
-                        and abs(err_pos.get("y", -999) - robot.y) < 3):
-                    same_location_errors.append({
-                        "robot": r.robot_id,
-                        "error_code": err["error_code"],
-                        "timestamp": str(err["timestamp"]),
-                    })
-                if r.robot_id == robot.robot_id:
-                    same_robot_errors.append({
-                        "error_code": err["error_code"],
-                        "name": err["name"],
-                        "timestamp": str(err["timestamp"]),
-                    })
+        cells = self._error_cell_index()
+        cx = int(robot.x // ERROR_CELL_SIZE)
+        cy = int(robot.y // ERROR_CELL_SIZE)
+        nearby_errors: list[ErrorRef] = []
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for ref in cells.get((cx + dx, cy + dy), ()):
+                    err_pos = ref[2]["position"]
+                    if (abs(err_pos["x"] - robot.x) < SAME_LOCATION_RADIUS
+                            and abs(err_pos["y"] - robot.y) < SAME_LOCATION_RADIUS):
+                        nearby_errors.append(ref)
+        nearby_errors.sort(key=itemgetter(0))
+
+        # Newest five, without copying the whole deque
+        recent_errors = list(islice(reversed(robot.error_history), 5))[::-1]
+        if full:
+            same_location_errors = [
+                {
+                    "robot": robot_id,
+                    "error_code": err["error_code"],
+                    "timestamp": to_iso(err["timestamp"]),
+                }
+                for _, robot_id, err in nearby_errors[-5:]  # last 5
+            ]
+            same_robot_errors = [
+                {
+                    "error_code": err["error_code"],
+                    "name": err["name"],
+                    "timestamp": to_iso(err["timestamp"]),
+                }
+                for err in recent_errors
+            ]
+        else:
+            # The rule-based analysis only counts these
+            same_location_errors = [
+                {"robot": robot_id, "error_code": err["error_code"]}
+                for _, robot_id, err in nearby_errors[-5:]
+            ]
+            same_robot_errors = [
+                {"error_code": err["error_code"]}
+                for err in recent_errors
+            ]
 
         # Nearest charger info
         charger_name, charger_pos, charger_dist = get_nearest_charging_station(robot.x, robot.y)
@@ -130,61 +278,49 @@ class RCAEngine:
             "error_doc": error_doc,
             "task": robot.task,
             "nearby_robots": nearby,
-            "same_location_errors": same_location_errors[-5:],  # last 5
-            "same_robot_errors": same_robot_errors[-5:],
+            "same_location_errors": same_location_errors,
+            "same_robot_errors": same_robot_errors,
             "nearest_charger": {"name": charger_name, "distance": round(charger_dist, 1)},
             "total_trail_points": len(robot.trail),
         }
 
-    async def _gemini_analysis(self, context: dict) -> str:
-        """Use Gemini to generate root cause analysis."""
-        import google.generativeai as genai
-
+    @classmethod
+    def _get_genai_model(cls):
+        """Configure the Gemini SDK once per API key and reuse the model handle."""
         api_key = os.getenv("GEMINI_API_KEY", "")
         if not api_key:
             raise ValueError("GEMINI_API_KEY not set")
 
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel("gemini-2.0-flash")
-
-        prompt = f"""You are analyzing a robot fleet error. Provide a concise root cause analysis.
-
-AFFECTED ROBOT:
-- ID: {context['robot_id']}
-- Vendor: {context['vendor']}
-- Position: {context['position']} in {context['zone']}
-- Battery: {context['battery']}%
-- Error: {json.dumps(context['error'], default=str)}
-- Current Task: {json.dumps(context['task'], default=str)}
-
-ERROR DOCUMENTATION:
-{json.dumps(context['error_doc'], indent=2) if context['error_doc'] else 'Not available'}
-
-NEARBY ROBOTS (within 15m):
-{json.dumps(context['nearby_robots'], indent=2)}
-
-HISTORICAL DATA:
-- Errors at this location: {json.dumps(context['same_location_errors'], default=str)}
-- This robot's error history: {json.dumps(context['same_robot_errors'], default=str)}
-- Nearest charger: {context['nearest_charger']['name']} ({context['nearest_charger']['distance']}m away)
-
-Provide analysis in this exact format:
+        if cls._genai_model is None or cls._genai_key != api_key:
+            import google.generativeai as genai
 
-WHAT HAPPENED:
-[1-2 sentences describing the event]
+            genai.configure(api_key=api_key)
+            cls._genai_model = genai.GenerativeModel("gemini-2.0-flash")
+            cls._genai_key = api_key
+        return cls._genai_model
 
-WHY:
-[Root cause explanation with evidence from the data]
-
-SUGGESTED FIX:
-1. [Step 1]
-2. [Step 2]
-3. [Step 3]
-
-PATTERN WARNING (if applicable):
-[Any recurring patterns detected, or "No recurring patterns detected."]"""
+    async def _gemini_analysis(self, context: dict) -> str:
+        """Use Gemini to generate root cause analysis."""
+        model = self._get_genai_model()
+
+        prompt = RCA_PROMPT.format(
+            robot_id=context["robot_id"],
+            vendor=context["vendor"],
+            position=context["position"],
+            zone=context["zone"],
+            battery=context["battery"],
+            error_json=json.dumps(context["error"], default=str),
+            task_json=json.dumps(context["task"], default=str),
+            error_doc_json=json.dumps(context["error_doc"], indent=2) if context["error_doc"] else "Not available",
+            nearby_json=json.dumps(context["nearby_robots"], indent=2),
+            same_location_json=json.dumps(context["same_location_errors"], default=str),
+            same_robot_json=json.dumps(context["same_robot_errors"], default=str),
+            charger_name=context["nearest_charger"]["name"],
+            charger_distance=context["nearest_charger"]["distance"],
+        )
 
-        response = await model.generate_content_async(prompt)
+        async with self._gemini_slots:
+            response = await model.generate_content_async(prompt)
         return response.text
 
     def _rule_based_analysis(self, context: dict) -> str:
@@ -195,10 +331,13 @@ PATTERN WARNING (if applicable):
         error_name = error.get("name", "Unknown Error") if error else "Unknown Error"
         nearby = context.get("nearby_robots", [])
         battery = context.get("battery", 0)
+        robot_id = context["robot_id"]
+        error_doc = context.get("error_doc")
+        charger = context["nearest_charger"]
 
         lines.append(f"**WHAT HAPPENED:**")
         lines.append(
-            f"{context['robot_id']} ({context['vendor']}) stopped at position "
+            f"{robot_id} ({context['vendor']}) stopped at position "
             f"{context['position']} in {context['zone']} with error {error_code} ({error_name})."
         )
 
@@ -206,27 +345,25 @@ PATTERN WARNING (if applicable):
         lines.append(f"\n**WHY:**")
 
         # Check for blocking robot
-        blockers = [n for n in nearby if n.get("idle_or_error") and n["distance"] < 3]
-        if blockers:
-            blocker = blockers[0]
+        blocker = next((n for n in nearby if n.get("idle_or_error") and n["distance"] < BLOCKER_DISTANCE), None)
+        if blocker:
             lines.append(
-                f"{context['robot_id']} was trying to proceed but {blocker['id']} "
+                f"{robot_id} was trying to proceed but {blocker['id']} "
                 f"({blocker['vendor']}) is {'idle' if blocker['status'] == 'idle' else 'in error state'} "
                 f"at {blocker['position']}, just {blocker['distance']}m away, "
                 f"directly blocking the path."
             )
         elif battery < 10:
             lines.append(
-                f"{context['robot_id']} has critically low battery ({battery}%). "
+                f"{robot_id} has critically low battery ({battery}%). "
                 f"The robot likely ran out of power before completing its task or reaching a charger. "
-                f"Nearest charging station is {context['nearest_charger']['name']} "
-                f"({context['nearest_charger']['distance']}m away)."
+                f"Nearest charging station is {charger['name']} "
+                f"({charger['distance']}m away)."
             )
-        elif context.get("error_doc"):
-            doc = context["error_doc"]
+        elif error_doc:
             lines.append(
-                f"Error {error_code} indicates: {doc['description']} "
-                f"Common causes include: {'; '.join(doc['common_causes'][:2])}."
+                f"Error {error_code} indicates: {error_doc['description']} "
+                f"Common causes include: {'; '.join(error_doc['common_causes'][:2])}."
             )
         else:
             lines.append(
@@ -237,44 +374,39 @@ PATTERN WARNING (if applicable):
 
         # Suggested fix
         lines.append(f"\n**SUGGESTED FIX:**")
-        step = 1
-
-        if blockers:
-            blocker = blockers[0]
-            lines.append(f"{step}. Move {blocker['id']} — assign it a new task or send to parking")
-            step += 1
-            lines.append(f"{step}. {context['robot_id']} should resume automatically once path clears")
-            step += 1
+        if blocker:
+            steps = [
+                f"Move {blocker['id']} — assign it a new task or send to parking",
+                f"{robot_id} should resume automatically once path clears",
+            ]
         elif battery < 10:
-            lines.append(f"{step}. Manually transport {context['robot_id']} to {context['nearest_charger']['name']}")
-            step += 1
-            if context.get("task"):
-                lines.append(f"{step}. Reassign task {context['task'].get('task_id', 'N/A')} to another robot")
-                step += 1
-        elif context.get("error_doc"):
-            for s in context["error_doc"].get("remediation_steps", [])[:3]:
-                lines.append(f"{step}. {s}")
-                step += 1
+            steps = [f"Manually transport {robot_id} to {charger['name']}"]
+            task = context.get("task")
+            if task:
+                steps.append(f"Reassign task {task.get('task_id', 'N/A')} to another robot")
+        elif error_doc:
+            steps = error_doc.get("remediation_steps", [])[:3]
         else:
-            lines.append(f"{step}. Check the robot's immediate surroundings for obstacles")
-            step += 1
-            lines.append(f"{step}. Try clearing the error and reassigning the task")
-            step += 1
+            steps = [
+                "Check the robot's immediate surroundings for obstacles",
+                "Try clearing the error and reassigning the task",
+            ]
+        lines.extend(f"{i}. {s}" for i, s in enumerate(steps, 1))
 
         # Pattern detection
-        location_errors = context.get("same_location_errors", [])
-        robot_errors = context.get("same_robot_errors", [])
+        location_count = len(context.get("same_location_errors", []))
+        robot_count = len(context.get("same_robot_errors", []))
 
         lines.append(f"\n**PATTERN WARNING:**")
-        if len(location_errors) >= 3:
+        if location_count >= 3:
             lines.append(
-                f"⚠️ This location has seen {len(location_errors)} errors recently. "
+                f"⚠️ This location has seen {location_count} errors recently. "
                 f"This may indicate a recurring obstruction or design issue. "
                 f"Consider adding an alternate route or marking this as a no-idle zone."
             )
-        elif len(robot_errors) >= 3:
+        elif robot_count >= 3:
             lines.append(
-                f"⚠️ {context['robot_id']} has had {len(robot_errors)} errors recently. "
+                f"⚠️ {robot_id} has had {robot_count} errors recently. "
                 f"Consider scheduling maintenance or inspection for this robot."
             )
         else:
@@ -10,15 +10,19 @@ from __future__ import annotations
 import asyncio
 import math
 import random
+import time
 import uuid
-from collections import deque
-from datetime import datetime, timedelta
+from collections import Counter, deque
+from itertools import islice
 from typing import Any
 
 from models import (
     ActivityEntry,
+    ActivityType,
     ErrorInfo,
+    ErrorSeverity,
     Position,
+    RobotPose,
     RobotStatus,
     Task,
     TaskStatus,
@@ -35,12 +39,75 @@ from facility import (
     get_zone_for_position,
     get_nearest_charging_station,
     get_random_station_pair,
-    distance,
 )
 from error_kb import AR_ERRORS, BALYO_ERRORS, AMZN_ERRORS
 from task_catalog import CATALOG_BY_ID, get_tasks_for_vendor, get_task_stations
 
 
+# --- History Bounds ---
+# All per-robot history lives in fixed-size deques, so memory and the size of
+# every unified state / WebSocket snapshot stay constant over a long run.
+TRAIL_LENGTH = 60              # 30s of positions at 500ms ticks
+ACTIVITY_LOG_LENGTH = 20       # entries kept per robot
+ACTIVITY_SNAPSHOT_LENGTH = 10  # newest entries included in each unified state
+ERROR_HISTORY_LENGTH = 64      # newest error records kept per robot
+
+# Error records carry the ERROR_CELL_SIZE-square grid cell of their position,
+# so RCA can bucket them by location without recomputing it
+ERROR_CELL_SIZE = 3
+
+
+# --- Battery Rates ---
+
+# Battery drain rates (% per tick at 500ms interval)
+DRAIN_RATES = {
+    "Amazon Normal": 0.8 / 120,      # 0.8% per minute / 120 ticks per minute
+    "Balyo": 0.6 / 120,
+    "Amazon Internal": 1.2 / 120,
+}
+
+# Charge rate (% per tick)
+CHARGE_RATE = 5.0 / 120  # 5% per minute
+
+
+# --- Vendor Status Encodings & Error Pools ---
+
+_AR_STATUS_CODES = {
+    RobotStatus.IDLE: 0,
+    RobotStatus.ACTIVE: 1,
+    RobotStatus.ERROR: 2,
+    RobotStatus.CHARGING: 3,
+    RobotStatus.OFFLINE: 4,
+}
+
+_BALYO_STATUS_STRINGS = {
+    RobotStatus.IDLE: "IDLE",
+    RobotStatus.ACTIVE: "OPERATIONAL",
+    RobotStatus.ERROR: "FAULT",
+    RobotStatus.CHARGING: "CHARGING",
+    RobotStatus.OFFLINE: "OFFLINE",
+}
+
+_AMZN_STATUS_DE = {
+    RobotStatus.IDLE: "Bereit",
+    RobotStatus.ACTIVE: "Aktiv",
+    RobotStatus.ERROR: "Fehler",
+    RobotStatus.CHARGING: "Laden",
+    RobotStatus.OFFLINE: "Offline",
+}
+
+
+# Random errors each vendor can raise (informational codes excluded)
+_ERROR_POOLS: dict[str, tuple] = {
+    vendor: tuple(e for e in errors if e.severity is not ErrorSeverity.INFO)
+    for vendor, errors in (
+        ("Amazon Normal", AR_ERRORS),
+        ("Balyo", BALYO_ERRORS),
+        ("Amazon Internal", AMZN_ERRORS),
+    )
+}
+
+
 # --- Internal Robot State (vendor-specific raw data) ---
 
 class RawRobot:
@@ -68,15 +135,15 @@ class RawRobot:
         self.task_destination: Position | None = None
         self.task_origin: Position | None = None
 
-        # Trail (last 60 positions for 30s at 500ms ticks)
-        self.trail: deque[tuple[float, float]] = deque(maxlen=60)
+        # Trail (oldest first)
+        self.trail: deque[tuple[float, float]] = deque(maxlen=TRAIL_LENGTH)
 
-        # Activity log (last 20 entries)
-        self.activity: deque[dict] = deque(maxlen=20)
+        # Activity log (newest first)
+        self.activity: deque[dict] = deque(maxlen=ACTIVITY_LOG_LENGTH)
 
         # Error state
         self.last_error: dict | None = None
-        self.error_start: datetime | None = None
+        self.error_start: float | None = None  # time.monotonic() when the error began
         self.stuck_ticks: int = 0
 
         # Stats
@@ -85,119 +152,103 @@ class RawRobot:
         self.total_error_time: float = 0.0
         self.total_charge_time: float = 0.0
         self.task_times: list[float] = []  # in seconds
-        self.error_history: list[dict] = []
-
-        # Battery drain rates (% per tick at 500ms interval)
-        self.drain_rates = {
-            "Amazon Normal": 0.8 / 120,      # 0.8% per minute / 120 ticks per minute
-            "Balyo": 0.6 / 120,
-            "Amazon Internal": 1.2 / 120,
-        }
-
-        # Charge rate (% per tick)
-        self.charge_rate = 5.0 / 120  # 5% per minute
+        # Error records (oldest first); the counters cover every error ever logged
+        self.error_history: deque[dict] = deque(maxlen=ERROR_HISTORY_LENGTH)
+        self.error_count: int = 0
+        self.error_counts_by_code: Counter[tuple[str, str]] = Counter()
+        self.error_counts_by_zone: Counter[str] = Counter()
+
+        # Battery drain and charge rates (% per tick); vendor never changes
+        self.drain_rate = DRAIN_RATES.get(vendor, 1.0 / 120)
+        self.charge_rate = CHARGE_RATE
+
+        # Vendor never changes, so pick the raw-format builder once
+        if vendor == "Amazon Normal":
+            self._to_vendor_raw = self._to_raw_amazon_normal
+        elif vendor == "Balyo":
+            self._to_vendor_raw = self._to_raw_balyo
+        else:  # Amazon Internal
+            self._to_vendor_raw = self._to_raw_amazon_internal
 
     def get_drain_rate(self) -> float:
-        return self.drain_rates.get(self.vendor, 1.0 / 120)
+        return self.drain_rate
 
-    def add_activity(self, description: str, activity_type: str):
+    def add_activity(self, description: str, activity_type: ActivityType):
         self.activity.appendleft({
-            "timestamp": datetime.now(),
+            "timestamp": time.time(),
             "description": description,
             "type": activity_type,
         })
 
+    def to_pose(self) -> RobotPose:
+        """Hot per-tick fields, rounded the same way the vendor payloads are."""
+        return (
+            self.robot_id,
+            round(self.x, 2),
+            round(self.y, 2),
+            round(self.heading, 1),
+            round(self.speed, 2),
+            self.status,
+            round(self.battery, 1),
+        )
+
     def to_raw_data(self) -> dict[str, Any]:
         """Convert to vendor-specific raw format for adapter processing."""
-        trail_data = []
-        task_data = None
-        error_data = None
-
-        if self.task:
-            task_data = dict(self.task)
-
-        if self.last_error:
-            error_data = dict(self.last_error)
-
-        activity_data = [dict(a) for a in list(self.activity)[:10]]
-
-        if self.vendor == "Amazon Normal":
-            status_code = {
-                RobotStatus.IDLE: 0,
-                RobotStatus.ACTIVE: 1,
-                RobotStatus.ERROR: 2,
-                RobotStatus.CHARGING: 3,
-                RobotStatus.OFFLINE: 4,
-            }.get(self.status, 0)
-
-            trail_data = [{"x": t[0], "y": t[1]} for t in self.trail]
-
-            return {
-                "robot_id": self.robot_id,
-                "position": {"x": round(self.x, 2), "y": round(self.y, 2)},
-                "status_code": status_code,
-                "battery": round(self.battery, 1),
-                "heading": round(self.heading, 1),
-                "speed": round(self.speed, 2),
-                "task": task_data,
-                "last_error": error_data,
-                "trail": trail_data,
-                "activity": activity_data,
-            }
-
-        elif self.vendor == "Balyo":
-            status_str = {
-                RobotStatus.IDLE: "IDLE",
-                RobotStatus.ACTIVE: "OPERATIONAL",
-                RobotStatus.ERROR: "FAULT",
-                RobotStatus.CHARGING: "CHARGING",
-                RobotStatus.OFFLINE: "OFFLINE",
-            }.get(self.status, "IDLE")
-
-            trail_data = [
+        # Adapters only read activity entries (they build fresh payload dicts),
+        # so the stored entries are passed through without a per-entry copy
+        return self._to_vendor_raw(
+            dict(self.task) if self.task else None,
+            dict(self.last_error) if self.last_error else None,
+            list(islice(self.activity, ACTIVITY_SNAPSHOT_LENGTH)),
+        )
+
+    def _to_raw_amazon_normal(self, task_data, error_data, activity_data) -> dict[str, Any]:
+        return {
+            "robot_id": self.robot_id,
+            "position": {"x": round(self.x, 2), "y": round(self.y, 2)},
+            "status_code": _AR_STATUS_CODES.get(self.status, 0),
+            "battery": round(self.battery, 1),
+            "heading": round(self.heading, 1),
+            "speed": round(self.speed, 2),
+            "task": task_data,
+            "last_error": error_data,
+            "trail": [{"x": t[0], "y": t[1]} for t in self.trail],
+            "activity": activity_data,
+        }
+
+    def _to_raw_balyo(self, task_data, error_data, activity_data) -> dict[str, Any]:
+        return {
+            "robot_id": self.robot_id,
+            "position": {
+                "lat": self.x / GRID_WIDTH,
+                "lng": self.y / GRID_HEIGHT,
+            },
+            "status_str": _BALYO_STATUS_STRINGS.get(self.status, "IDLE"),
+            "battery_pct": round(self.battery, 1),
+            "orientation_deg": round(self.heading, 1),
+            "velocity_mps": round(self.speed, 2),
+            "task": task_data,
+            "last_error": error_data,
+            "trail": [
                 {"lat": t[0] / GRID_WIDTH, "lng": t[1] / GRID_HEIGHT}
                 for t in self.trail
-            ]
-
-            return {
-                "robot_id": self.robot_id,
-                "position": {
-                    "lat": self.x / GRID_WIDTH,
-                    "lng": self.y / GRID_HEIGHT,
-                },
-                "status_str": status_str,
-                "battery_pct": round(self.battery, 1),
-                "orientation_deg": round(self.heading, 1),
-                "velocity_mps": round(self.speed, 2),
-                "task": task_data,
-                "last_error": error_data,
-                "trail": trail_data,
-                "activity": activity_data,
-            }
+            ],
+            "activity": activity_data,
+        }
 
-        else:  # Amazon Internal
-            status_de = {
-                RobotStatus.IDLE: "Bereit",
-                RobotStatus.ACTIVE: "Aktiv",
-                RobotStatus.ERROR: "Fehler",
-                RobotStatus.CHARGING: "Laden",
-                RobotStatus.OFFLINE: "Offline",
-            }.get(self.status, "Bereit")
-
-            trail_data = [[t[1], t[0]] for t in self.trail]  # [row, col] = [y, x]
-
-            return {
-                "robot_id": self.robot_id,
-                "position": [round(self.y, 2), round(self.x, 2)],  # [row, col]
-                "status_de": status_de,
-                "batterie": round(self.battery, 1),
-                "richtung": round(self.heading, 1),
-                "geschwindigkeit": round(self.speed, 2),
-                "task": task_data,
-                "last_error": error_data,
-                "trail": trail_data,
-                "activity": activity_data,
-            }
+    def _to_raw_amazon_internal(self, task_data, error_data, activity_data) -> dict[str, Any]:
+        return {
+            "robot_id": self.robot_id,
+            "position": [round(self.y, 2), round(self.x, 2)],  # [row, col]
+            "status_de": _AMZN_STATUS_DE.get(self.status, "Bereit"),
+            "batterie": round(self.battery, 1),
+            "richtung": round(self.heading, 1),
+            "geschwindigkeit": round(self.speed, 2),
+            "task": task_data,
+            "last_error": error_data,
+            "trail": [[t[1], t[0]] for t in self.trail],  # [row, col] = [y, x]
+            "activity": activity_data,
+        }
 
 
 class FleetSimulator:
@@ -210,7 +261,20 @@ class FleetSimulator:
         self.robots: dict[str, RawRobot] = {}
         self.tick_count: int = 0
         self.task_counter: int = 0
+        # Bumped on every tick and operator command so readers can cache
+        # anything derived from fleet state
+        self.state_version: int = 0
+        # Unified states of the whole fleet, rebuilt at most once per state version
+        self._unified: list[UnifiedRobotState] = []
+        self._unified_by_id: dict[str, UnifiedRobotState] = {}
+        self._unified_version = -1
         self._initialize_fleet()
+        # The fleet roster is fixed after init; lowercased for query matching
+        self.robot_ids_lower: frozenset[str] = frozenset(rid.lower() for rid in self.robots)
+        # Vendor never changes either, so the per-vendor grouping is built once
+        self.robots_by_vendor: dict[str, list[RawRobot]] = {}
+        for robot in self.robots.values():
+            self.robots_by_vendor.setdefault(robot.vendor, []).append(robot)
 
     def _initialize_fleet(self):
         """Create 24 robots: 8 Amazon Normal, 12 Balyo, 4 Amazon Internal."""
@@ -272,7 +336,7 @@ class FleetSimulator:
             "from_station": from_name,
             "to_station": to_name,
             "status": "in_progress",
-            "started_at": datetime.now(),
+            "started_at": time.time(),
             "eta_seconds": None,
         }
         robot.task_destination = to_pos
@@ -281,7 +345,7 @@ class FleetSimulator:
         robot.speed = random.uniform(1.2, 2.8)  # realistic AMR speeds (m/s)
         robot.add_activity(
             f"Started task {task_id}: {task_type} from {from_name} to {to_name}",
-            "task_started",
+            ActivityType.TASK_STARTED,
         )
 
     def _move_robot(self, robot: RawRobot):
@@ -318,8 +382,8 @@ class FleetSimulator:
         actual_dist = math.sqrt((robot.x - old_x) ** 2 + (robot.y - old_y) ** 2)
         robot.total_distance += actual_dist
 
-        # Update ETA
-        remaining = distance(Position(x=robot.x, y=robot.y), dest)
+        # Update ETA: the step was taken straight along the line to dest
+        remaining = dist - step
         robot.task["eta_seconds"] = remaining / max(robot.speed, 0.1)
 
     def _complete_task(self, robot: RawRobot):
@@ -327,12 +391,12 @@ class FleetSimulator:
         if robot.task:
             task_id = robot.task["task_id"]
             started = robot.task["started_at"]
-            duration = (datetime.now() - started).total_seconds()
+            duration = time.time() - started
             robot.task_times.append(duration)
             robot.tasks_completed += 1
             robot.add_activity(
                 f"Completed task {task_id}",
-                "task_completed",
+                ActivityType.TASK_COMPLETED,
             )
             robot.task = None
         robot.task_destination = None
@@ -346,20 +410,34 @@ class FleetSimulator:
             robot.battery = min(100.0, robot.battery + robot.charge_rate)
             robot.total_charge_time += 0.5  # 500ms
             if robot.battery >= 95.0:
-                robot.add_activity("Charged to 95%", "charging_complete")
+                robot.add_activity("Charged to 95%", ActivityType.CHARGING_COMPLETE)
                 robot.status = RobotStatus.IDLE
                 robot.speed = 0.0
             return
 
         if robot.status in (RobotStatus.ACTIVE, RobotStatus.IDLE):
-            drain = robot.get_drain_rate()
+            drain = robot.drain_rate
             if robot.status == RobotStatus.IDLE:
                 drain *= 0.3  # Idle drains much less
             robot.battery = max(0, robot.battery - drain)
 
         # Auto-charge when low
         if robot.battery < 15.0 and robot.status != RobotStatus.CHARGING and robot.status != RobotStatus.ERROR:
-            name, pos, dist = get_nearest_charging_station(robot.x, robot.y)
+            task = robot.task
+            heading_to_charger = (
+                task is not None
+                and task["task_type"] == "charging"
+                and task["to_station"] in CHARGING_STATIONS
+                and robot.task_destination is not None
+            )
+            if heading_to_charger:
+                # Already on its way: the nearest charger stays nearest while
+                # driving straight at it, so skip the lookup and keep the task
+                name = task["to_station"]
+                pos = robot.task_destination
+                dist = ((pos.x - robot.x) ** 2 + (pos.y - robot.y) ** 2) ** 0.5
+            else:
+                name, pos, dist = get_nearest_charging_station(robot.x, robot.y)
             if dist < 2.0:
                 # Close enough to charging station
                 robot.status = RobotStatus.CHARGING
@@ -368,29 +446,30 @@ class FleetSimulator:
                     robot.task["status"] = "cancelled"
                     robot.add_activity(
                         f"Cancelled task {robot.task['task_id']} — battery critical",
-                        "task_cancelled",
+                        ActivityType.TASK_CANCELLED,
                     )
                     robot.task = None
                 robot.task_destination = None
-                robot.add_activity(f"Docked at {name} for charging ({robot.battery:.0f}%)", "charging_start")
+                robot.add_activity(f"Docked at {name} for charging ({robot.battery:.0f}%)", ActivityType.CHARGING_START)
             else:
                 # Navigate to charger
-                if robot.task:
-                    robot.task["status"] = "cancelled"
-                    robot.add_activity(
-                        f"Cancelled task {robot.task['task_id']} — navigating to charger",
-                        "task_cancelled",
-                    )
-                robot.task = {
-                    "task_id": self._next_task_id(),
-                    "task_type": "charging",
-                    "from_station": get_zone_for_position(robot.x, robot.y),
-                    "to_station": name,
-                    "status": "in_progress",
-                    "started_at": datetime.now(),
-                    "eta_seconds": dist / 1.0,
-                }
-                robot.task_destination = pos
+                if not heading_to_charger:
+                    if robot.task:
+                        robot.task["status"] = "cancelled"
+                        robot.add_activity(
+                            f"Cancelled task {robot.task['task_id']} — navigating to charger",
+                            ActivityType.TASK_CANCELLED,
+                        )
+                    robot.task = {
+                        "task_id": self._next_task_id(),
+                        "task_type": "charging",
+                        "from_station": get_zone_for_position(robot.x, robot.y),
+                        "to_station": name,
+                        "status": "in_progress",
+                        "started_at": time.time(),
+                        "eta_seconds": dist / 1.0,
+                    }
+                    robot.task_destination = pos
                 robot.status = RobotStatus.ACTIVE
                 robot.speed = 1.0
 
@@ -410,43 +489,42 @@ class FleetSimulator:
             return
 
         # Pick a random error for this vendor
-        if robot.vendor == "Amazon Normal":
-            error_pool = [e for e in AR_ERRORS if e.severity.value != "info"]
-        elif robot.vendor == "Balyo":
-            error_pool = [e for e in BALYO_ERRORS if e.severity.value != "info"]
-        else:
-            error_pool = [e for e in AMZN_ERRORS if e.severity.value != "info"]
-
-        error = random.choice(error_pool)
+        error = random.choice(_ERROR_POOLS.get(robot.vendor, _ERROR_POOLS["Amazon Internal"]))
 
         robot.status = RobotStatus.ERROR
         robot.speed = 0.0
-        robot.error_start = datetime.now()
+        robot.error_start = time.monotonic()
+        now = time.time()
         robot.last_error = {
             "error_code": error.code,
             "name": error.name,
             "description": error.description,
-            "timestamp": datetime.now(),
+            "timestamp": now,
             "resolved": False,
         }
+        zone = get_zone_for_position(robot.x, robot.y)
+        robot.error_count += 1
+        robot.error_counts_by_code[(error.code, error.name)] += 1
+        robot.error_counts_by_zone[zone] += 1
         robot.error_history.append({
             "error_code": error.code,
             "name": error.name,
-            "timestamp": datetime.now(),
+            "timestamp": now,
             "position": {"x": robot.x, "y": robot.y},
-            "zone": get_zone_for_position(robot.x, robot.y),
+            "cell": (int(robot.x // ERROR_CELL_SIZE), int(robot.y // ERROR_CELL_SIZE)),
+            "zone": zone,
         })
         robot.add_activity(
             f"Error: {error.code} — {error.name}",
-            "error",
+            ActivityType.ERROR,
         )
 
     def _maybe_resolve_error(self, robot: RawRobot):
         """Auto-resolve some errors after a delay."""
-        if robot.status != RobotStatus.ERROR or not robot.error_start:
+        if robot.status != RobotStatus.ERROR or robot.error_start is None:
             return
 
-        elapsed = (datetime.now() - robot.error_start).total_seconds()
+        elapsed = time.monotonic() - robot.error_start
         robot.total_error_time += 0.5
 
         # Auto-resolve after 10-60 seconds (random)
@@ -456,11 +534,12 @@ class FleetSimulator:
             if robot.last_error:
                 robot.last_error["resolved"] = True
             robot.error_start = None
-            robot.add_activity("Error resolved — resuming operations", "error_resolved")
+            robot.add_activity("Error resolved — resuming operations", ActivityType.ERROR_RESOLVED)
 
     def tick(self):
         """Advance simulation by one tick (500ms)."""
         self.tick_count += 1
+        self.state_version += 1
 
         for robot in self.robots.values():
             # Record trail
@@ -493,19 +572,28 @@ class FleetSimulator:
 
     def get_all_unified(self) -> list[UnifiedRobotState]:
         """Get all robots as unified state objects."""
-        result = []
-        for robot in self.robots.values():
-            adapter = get_adapter(robot.vendor)
-            raw_data = robot.to_raw_data()
-            unified = adapter.normalize(raw_data)
-            result.append(unified)
-        return result
+        if self._unified_version != self.state_version:
+            # Every consumer within a tick (broadcast, conflict checks, REST,
+            # RCA) sees the same state, so normalize the fleet only once
+            self._unified = [
+                get_adapter(robot.vendor).normalize(robot.to_raw_data())
+                for robot in self.robots.values()
+            ]
+            self._unified_by_id = dict(zip(self.robots, self._unified))
+            self._unified_version = self.state_version
+        return list(self._unified)
+
+    def get_all_poses(self) -> list[RobotPose]:
+        """Get every robot's pose straight from the raw state, skipping the adapters."""
+        return [robot.to_pose() for robot in self.robots.values()]
 
     def get_robot_unified(self, robot_id: str) -> UnifiedRobotState | None:
         """Get a single robot's unified state."""
         robot = self.robots.get(robot_id)
         if not robot:
             return None
+        if self._unified_version == self.state_version:
+            return self._unified_by_id[robot_id]
         adapter = get_adapter(robot.vendor)
         return adapter.normalize(robot.to_raw_data())
 
@@ -518,132 +606,141 @@ class FleetSimulator:
         robot = self.robots.get(robot_id)
         if not robot:
             return {"success": False, "message": "Robot not found"}
+        self.state_version += 1
 
-        if command == "pause":
-            if robot.status == RobotStatus.ACTIVE:
-                robot.status = RobotStatus.IDLE
-                robot.speed = 0.0
-                robot.add_activity("Paused by operator", "command")
-                return {"success": True}
-            return {"success": False, "message": "Robot is not active"}
+        handler = self._COMMANDS.get(command)
+        if handler is None:
+            return {"success": False, "message": f"Unknown command: {command}"}
+        return handler(self, robot, **kwargs)
 
-        elif command == "resume":
-            if robot.status == RobotStatus.IDLE and robot.task_destination:
-                robot.status = RobotStatus.ACTIVE
-                robot.speed = random.uniform(1.2, 2.8)
-                robot.add_activity("Resumed by operator", "command")
-                return {"success": True}
-            return {"success": False, "message": "Robot has no destination to resume to"}
-
-        elif command == "send_to_charging":
-            name, pos, dist = get_nearest_charging_station(robot.x, robot.y)
-            if robot.task:
-                robot.task["status"] = "cancelled"
-                robot.add_activity(f"Task cancelled — sent to charging", "command")
-            robot.task = {
-                "task_id": self._next_task_id(),
-                "task_type": "charging",
-                "from_station": get_zone_for_position(robot.x, robot.y),
-                "to_station": name,
-                "status": "in_progress",
-                "started_at": datetime.now(),
-                "eta_seconds": dist / 1.0,
-            }
-            robot.task_destination = pos
-            robot.status = RobotStatus.ACTIVE
-            robot.speed = 1.5
-            robot.add_activity(f"Sent to {name} for charging", "command")
-            return {
-                "success": True,
-                "charging_target": {"name": name, "x": pos.x, "y": pos.y},
-                "robot_position": {"x": robot.x, "y": robot.y},
-            }
-
-        elif command == "assign_task":
-            from_station = kwargs.get("from_station")
-            to_station = kwargs.get("to_station")
-            task_type = kwargs.get("task_type", "transport")
-            catalog_task_id = kwargs.get("catalog_task_id")  # e.g. "move_pod"
-
-            # Look up catalog task for speed range
-            cat = CATALOG_BY_ID.get(catalog_task_id) if catalog_task_id else None
-            task_label = cat.name if cat else task_type  # display name
-
-            # Auto-pick stations if not provided
-            if not from_station or from_station not in STATIONS:
-                from_station, _ = get_task_stations(catalog_task_id or "")
-            if not to_station or to_station not in STATIONS:
-                _, to_station = get_task_stations(catalog_task_id or "")
-            # Ensure they're different
-            if from_station == to_station:
-                all_names = [n for n in STATIONS if n != from_station]
-                to_station = random.choice(all_names)
-
-            from_pos = STATIONS[from_station]
-            to_pos = STATIONS[to_station]
-            task_id = self._next_task_id()
-
-            speed_lo, speed_hi = (cat.speed_range if cat else (1.2, 2.8))
-
-            robot.task = {
-                "task_id": task_id,
-                "task_type": task_label,
-                "from_station": from_station,
-                "to_station": to_station,
-                "status": "in_progress",
-                "started_at": datetime.now(),
-                "eta_seconds": None,
-                "catalog_task_id": catalog_task_id,
-            }
-            robot.task_destination = to_pos
-            robot.task_origin = from_pos
+    def _cmd_pause(self, robot: RawRobot, **kwargs) -> dict:
+        if robot.status == RobotStatus.ACTIVE:
+            robot.status = RobotStatus.IDLE
+            robot.speed = 0.0
+            robot.add_activity("Paused by operator", ActivityType.COMMAND)
+            return {"success": True}
+        return {"success": False, "message": "Robot is not active"}
+
+    def _cmd_resume(self, robot: RawRobot, **kwargs) -> dict:
+        if robot.status == RobotStatus.IDLE and robot.task_destination:
             robot.status = RobotStatus.ACTIVE
-            robot.speed = random.uniform(speed_lo, speed_hi)
-            robot.add_activity(
-                f"Started {task_label} ({task_id}): {from_station} → {to_station}",
-                "task_started",
-            )
-            return {
-                "success": True,
-                "task_id": task_id,
-                "task_name": task_label,
-                "from_station": from_station,
-                "to_station": to_station,
-                "destination": {"x": to_pos.x, "y": to_pos.y},
-            }
-
-        elif command == "clear_error":
-            if robot.status == RobotStatus.ERROR:
-                robot.status = RobotStatus.IDLE
-                robot.speed = 0.0
-                if robot.last_error:
-                    robot.last_error["resolved"] = True
-                robot.error_start = None
-                robot.add_activity("Error cleared by operator", "command")
-                return {"success": True}
-            return {"success": False, "message": "Robot has no active error"}
+            robot.speed = random.uniform(1.2, 2.8)
+            robot.add_activity("Resumed by operator", ActivityType.COMMAND)
+            return {"success": True}
+        return {"success": False, "message": "Robot has no destination to resume to"}
 
-        return {"success": False, "message": f"Unknown command: {command}"}
+    def _cmd_send_to_charging(self, robot: RawRobot, **kwargs) -> dict:
+        name, pos, dist = get_nearest_charging_station(robot.x, robot.y)
+        if robot.task:
+            robot.task["status"] = "cancelled"
+            robot.add_activity(f"Task cancelled — sent to charging", ActivityType.COMMAND)
+        robot.task = {
+            "task_id": self._next_task_id(),
+            "task_type": "charging",
+            "from_station": get_zone_for_position(robot.x, robot.y),
+            "to_station": name,
+            "status": "in_progress",
+            "started_at": time.time(),
+            "eta_seconds": dist / 1.0,
+        }
+        robot.task_destination = pos
+        robot.status = RobotStatus.ACTIVE
+        robot.speed = 1.5
+        robot.add_activity(f"Sent to {name} for charging", ActivityType.COMMAND)
+        return {
+            "success": True,
+            "charging_target": {"name": name, "x": pos.x, "y": pos.y},
+            "robot_position": {"x": robot.x, "y": robot.y},
+        }
+
+    def _cmd_assign_task(self, robot: RawRobot, **kwargs) -> dict:
+        from_station = kwargs.get("from_station")
+        to_station = kwargs.get("to_station")
+        task_type = kwargs.get("task_type", "transport")
+        catalog_task_id = kwargs.get("catalog_task_id")  # e.g. "move_pod"
+
+        # Look up catalog task for speed range
+        cat = CATALOG_BY_ID.get(catalog_task_id) if catalog_task_id else None
+        task_label = cat.name if cat else task_type  # display name
+
+        # Auto-pick stations if not provided
+        if not from_station or from_station not in STATIONS:
+            from_station, _ = get_task_stations(catalog_task_id or "")
+        if not to_station or to_station not in STATIONS:
+            _, to_station = get_task_stations(catalog_task_id or "")
+        # Ensure they're different
+        if from_station == to_station:
+            all_names = [n for n in STATIONS if n != from_station]
+            to_station = random.choice(all_names)
+
+        from_pos = STATIONS[from_station]
+        to_pos = STATIONS[to_station]
+        task_id = self._next_task_id()
+
+        speed_lo, speed_hi = (cat.speed_range if cat else (1.2, 2.8))
+
+        robot.task = {
+            "task_id": task_id,
+            "task_type": task_label,
+            "from_station": from_station,
+            "to_station": to_station,
+            "status": "in_progress",
+            "started_at": time.time(),
+            "eta_seconds": None,
+            "catalog_task_id": catalog_task_id,
+        }
+        robot.task_destination = to_pos
+        robot.task_origin = from_pos
+        robot.status = RobotStatus.ACTIVE
+        robot.speed = random.uniform(speed_lo, speed_hi)
+        robot.add_activity(
+            f"Started {task_label} ({task_id}): {from_station} → {to_station}",
+            ActivityType.TASK_STARTED,
+        )
+        return {
+            "success": True,
+            "task_id": task_id,
+            "task_name": task_label,
+            "from_station": from_station,
+            "to_station": to_station,
+            "destination": {"x": to_pos.x, "y": to_pos.y},
+        }
+
+    def _cmd_clear_error(self, robot: RawRobot, **kwargs) -> dict:
+        if robot.status == RobotStatus.ERROR:
+            robot.status = RobotStatus.IDLE
+            robot.speed = 0.0
+            if robot.last_error:
+                robot.last_error["resolved"] = True
+            robot.error_start = None
+            robot.add_activity("Error cleared by operator", ActivityType.COMMAND)
+            return {"success": True}
+        return {"success": False, "message": "Robot has no active error"}
+
+    # Operator command name -> handler
+    _COMMANDS = {
+        "pause": _cmd_pause,
+        "resume": _cmd_resume,
+        "send_to_charging": _cmd_send_to_charging,
+        "assign_task": _cmd_assign_task,
+        "clear_error": _cmd_clear_error,
+    }
 
     def get_fleet_summary(self) -> dict:
         """Get a text summary of the fleet for LLM context."""
-        robots = self.get_all_unified()
-        active = sum(1 for r in robots if r.status == RobotStatus.ACTIVE)
-        idle = sum(1 for r in robots if r.status == RobotStatus.IDLE)
-        error = sum(1 for r in robots if r.status == RobotStatus.ERROR)
-        charging = sum(1 for r in robots if r.status == RobotStatus.CHARGING)
-        offline = sum(1 for r in robots if r.status == RobotStatus.OFFLINE)
+        # Raw status is what the adapters normalize, so count it directly
+        # rather than building the unified snapshot
+        counts = Counter(r.status for r in self.robots.values())
 
         return {
-            "total_robots": len(robots),
-            "active": active,
-            "idle": idle,
-            "error": error,
-            "charging": charging,
-            "offline": offline,
+            "total_robots": len(self.robots),
+            "active": counts[RobotStatus.ACTIVE],
+            "idle": counts[RobotStatus.IDLE],
+            "error": counts[RobotStatus.ERROR],
+            "charging": counts[RobotStatus.CHARGING],
+            "offline": counts[RobotStatus.OFFLINE],
             "vendors": {
-                "Amazon Normal": sum(1 for r in robots if r.vendor == "Amazon Normal"),
-                "Balyo": sum(1 for r in robots if r.vendor == "Balyo"),
-                "Amazon Internal": sum(1 for r in robots if r.vendor == "Amazon Internal"),
+                vendor: len(self.robots_by_vendor.get(vendor, ()))
+                for vendor in ("Amazon Normal", "Balyo", "Amazon Internal")
             },
         }
@@ -6,13 +6,14 @@ and auto-generates from/to station context.
 
 from __future__ import annotations
 
+import json
 from dataclasses import dataclass
 from facility import get_random_station_pair
 
 
 # --- Task Definition ---
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class TaskDef:
     """A warehouse task type that can be assigned to robots."""
     id: str                             # unique slug
@@ -20,7 +21,7 @@ class TaskDef:
     category: str                       # grouping
     icon: str                           # emoji
     description: str                    # one-liner for UI
-    vendors: list[str]                  # which vendors can do this
+    vendors: tuple[str, ...]            # which vendors can do this
     auto_from: bool = True              # auto-pick a 'from' station
     auto_to: bool = True                # auto-pick a 'to' station
     speed_range: tuple[float, float] = (1.2, 2.8)   # m/s
@@ -29,7 +30,7 @@ class TaskDef:
 
 # --- The Catalog ---
 
-TASK_CATALOG: list[TaskDef] = [
+TASK_CATALOG: tuple[TaskDef, ...] = (
     # 1. Move & position inventory pods
     TaskDef(
         id="move_pod",
@@ -37,7 +38,7 @@ TASK_CATALOG: list[TaskDef] = [
         category="Inventory Movement",
         icon="📦",
         description="Drive under a shelving pod, lift it, and transport it to a workstation",
-        vendors=["Amazon Normal"],
+        vendors=("Amazon Normal",),
         speed_range=(1.0, 2.0),
     ),
     # 2. Transport bins/totes (Sequoia-style)
@@ -47,7 +48,7 @@ TASK_CATALOG: list[TaskDef] = [
         category="Inventory Movement",
         icon="🗃️",
         description="Move a standardized bin or tote between storage frame and work cell",
-        vendors=["Amazon Normal", "Balyo"],
+        vendors=("Amazon Normal", "Balyo"),
         speed_range=(1.2, 2.5),
     ),
     # 3. Stow new inventory
@@ -57,7 +58,7 @@ TASK_CATALOG: list[TaskDef] = [
         category="Inbound",
         icon="📥",
         description="Bring empty/partial pod to stower, then return to optimized storage spot",
-        vendors=["Amazon Normal", "Amazon Internal"],
+        vendors=("Amazon Normal", "Amazon Internal"),
         speed_range=(1.0, 1.8),
         duration_mult=1.3,
     ),
@@ -68,7 +69,7 @@ TASK_CATALOG: list[TaskDef] = [
         category="Picking",
         icon="🤖",
         description="Present bin to robotic arm (Sparrow) for individual item pick via vision + suction",
-        vendors=["Amazon Normal"],
+        vendors=("Amazon Normal",),
         speed_range=(0.8, 1.5),
         duration_mult=1.5,
     ),
@@ -79,7 +80,7 @@ TASK_CATALOG: list[TaskDef] = [
         category="Picking",
         icon="👤",
         description="Bring pod to human picker station, rotate to correct shelf face, queue and wait",
-        vendors=["Amazon Normal", "Balyo"],
+        vendors=("Amazon Normal", "Balyo"),
         speed_range=(1.0, 2.2),
     ),
     # 6. Move items between pick/pack/sort
@@ -89,7 +90,7 @@ TASK_CATALOG: list[TaskDef] = [
         category="Transport",
         icon="🔄",
         description="Move totes between picking, packing, and sorting areas, rerouting around bottlenecks",
-        vendors=["Amazon Normal", "Balyo", "Amazon Internal"],
+        vendors=("Amazon Normal", "Balyo", "Amazon Internal"),
         speed_range=(1.5, 3.0),
     ),
     # 7. Assist with packing
@@ -99,7 +100,7 @@ TASK_CATALOG: list[TaskDef] = [
         category="Packing",
         icon="📦",
         description="Feed items to automated packing station, match packing pace to picking throughput",
-        vendors=["Balyo", "Amazon Internal"],
+        vendors=("Balyo", "Amazon Internal"),
         speed_range=(1.0, 2.0),
         duration_mult=1.2,
     ),
@@ -110,7 +111,7 @@ TASK_CATALOG: list[TaskDef] = [
         category="Sorting",
         icon="📮",
         description="Carry labeled package to correct destination chute using floor markers, tilt to release",
-        vendors=["Amazon Normal", "Balyo"],
+        vendors=("Amazon Normal", "Balyo"),
         speed_range=(1.5, 3.5),
         duration_mult=0.7,
     ),
@@ -121,7 +122,7 @@ TASK_CATALOG: list[TaskDef] = [
         category="Sorting",
         icon="🏷️",
         description="Present packages to robotic arms for barcode read, routing, and placement onto outbound lanes",
-        vendors=["Amazon Normal"],
+        vendors=("Amazon Normal",),
         speed_range=(1.0, 2.0),
     ),
     # 10. Consolidate orders / build outbound loads (Blue Jay)
@@ -131,7 +132,7 @@ TASK_CATALOG: list[TaskDef] = [
         category="Outbound",
         icon="📋",
         description="Gather items from multiple picks into shared containers for same truck/route",
-        vendors=["Amazon Normal", "Balyo"],
+        vendors=("Amazon Normal", "Balyo"),
         speed_range=(1.0, 2.5),
         duration_mult=1.4,
     ),
@@ -142,7 +143,7 @@ TASK_CATALOG: list[TaskDef] = [
         category="Inbound",
         icon="🚛",
         description="Move inbound pallets/containers from dock to staging or de-palletizing area",
-        vendors=["Balyo", "Amazon Internal"],
+        vendors=("Balyo", "Amazon Internal"),
         speed_range=(0.8, 1.8),
         duration_mult=1.3,
     ),
@@ -153,7 +154,7 @@ TASK_CATALOG: list[TaskDef] = [
         category="Operations",
         icon="🛡️",
         description="Patrol zone scanning for obstacles, humans in robot areas, and congestion — report anomalies",
-        vendors=["Amazon Normal", "Balyo", "Amazon Internal"],
+        vendors=("Amazon Normal", "Balyo", "Amazon Internal"),
         speed_range=(0.5, 1.2),
         duration_mult=2.0,
     ),
@@ -164,36 +165,97 @@ TASK_CATALOG: list[TaskDef] = [
         category="Operations",
         icon="🏗️",
         description="Access top-level pod/rack positions for storage or retrieval, keeping humans at ground level",
-        vendors=["Amazon Normal", "Amazon Internal"],
+        vendors=("Amazon Normal", "Amazon Internal"),
         speed_range=(0.6, 1.5),
         duration_mult=1.6,
     ),
-]
+)
 
 # --- Index ---
 CATALOG_BY_ID: dict[str, TaskDef] = {t.id: t for t in TASK_CATALOG}
 
-# Categories in display order
-TASK_CATEGORIES: list[str] = list(dict.fromkeys(t.category for t in TASK_CATALOG))
+# Categories in display order (first appearance in the catalog)
+TASK_CATEGORIES: tuple[str, ...] = tuple(dict.fromkeys(t.category for t in TASK_CATALOG))
 
-def get_tasks_for_vendor(vendor: str) -> list[TaskDef]:
+
+def _build_keyword_index() -> dict[str, dict[str, int]]:
+    """Map each matching keyword to {task_id: occurrences} across the catalog.
+
+    Keywords are the words longer than three characters in a task's name,
+    description and category, counted as many times as they occur.
+    """
+    index: dict[str, dict[str, int]] = {}
+    for t in TASK_CATALOG:
+        for kw in f"{t.name} {t.description} {t.category}".lower().split():
+            if len(kw) > 3:
+                weights = index.setdefault(kw, {})
+                weights[t.id] = weights.get(t.id, 0) + 1
+    return index
+
+
+# Keyword index used to score free-text instructions against the catalog
+TASK_KEYWORDS: dict[str, dict[str, int]] = _build_keyword_index()
+
+
+def _build_vendor_index() -> dict[str, tuple[TaskDef, ...]]:
+    """Map each vendor to the tasks its robots can perform, in catalog order."""
+    index: dict[str, list[TaskDef]] = {}
+    for t in TASK_CATALOG:
+        for vendor in t.vendors:
+            index.setdefault(vendor, []).append(t)
+    return {vendor: tuple(tasks) for vendor, tasks in index.items()}
+
+
+# The catalog is static, so per-vendor task lists are built once at import
+TASKS_BY_VENDOR: dict[str, tuple[TaskDef, ...]] = _build_vendor_index()
+
+def get_tasks_for_vendor(vendor: str) -> tuple[TaskDef, ...]:
     """Return all tasks a given vendor's robots can perform."""
-    return [t for t in TASK_CATALOG if vendor in t.vendors]
+    return TASKS_BY_VENDOR.get(vendor, ())
 
 def get_task_stations(task_id: str) -> tuple[str, str]:
     """Auto-generate appropriate from/to stations for a task."""
     return get_random_station_pair()
 
-def catalog_to_dict() -> list[dict]:
-    """Serialize the full catalog for the API."""
-    return [
-        {
-            "id": t.id,
-            "name": t.name,
-            "category": t.category,
-            "icon": t.icon,
-            "description": t.description,
-            "vendors": t.vendors,
-        }
-        for t in TASK_CATALOG
-    ]
+def _task_to_dict(t: TaskDef) -> dict:
+    """Serialize one catalog task for the API."""
+    return {
+        "id": t.id,
+        "name": t.name,
+        "category": t.category,
+        "icon": t.icon,
+        "description": t.description,
+        "vendors": t.vendors,
+    }
+
+
+# API payloads are built once at import; callers must treat them as read-only
+_CATALOG_DICTS: list[dict] = [_task_to_dict(t) for t in TASK_CATALOG]
+_CATALOG_DICTS_BY_VENDOR: dict[str, list[dict]] = {
+    vendor: [d for t, d in zip(TASK_CATALOG, _CATALOG_DICTS) if vendor in t.vendors]
+    for vendor in TASKS_BY_VENDOR
+}
+
+def catalog_to_dict(vendor: str | None = None) -> list[dict]:
+    """Serialize the full catalog, or one vendor's tasks, for the API."""
+    if not vendor:
+        return _CATALOG_DICTS
+    return _CATALOG_DICTS_BY_VENDOR.get(vendor, [])
+
+
+def _encode(payload: list[dict]) -> bytes:
+    # Same encoding FastAPI's JSONResponse would produce for the payload
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+# Encoded response bodies for /api/task-catalog, also built once
+_CATALOG_JSON: bytes = _encode(_CATALOG_DICTS)
+_CATALOG_JSON_BY_VENDOR: dict[str, bytes] = {
+    vendor: _encode(payload) for vendor, payload in _CATALOG_DICTS_BY_VENDOR.items()
+}
+
+def catalog_to_json(vendor: str | None = None) -> bytes:
+    """catalog_to_dict(vendor), pre-encoded as a JSON response body."""
+    if not vendor:
+        return _CATALOG_JSON
+    return _CATALOG_JSON_BY_VENDOR.get(vendor, b"[]")
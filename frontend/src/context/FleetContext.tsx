@@ -1,6 +1,6 @@
 import React, { createContext, useContext, useReducer } from 'react';
 import type { ReactNode } from 'react';
-import type { Robot, Alert, Facility, ChatMessage, Position, CatalogTask } from '../types/robot';
+import type { Robot, RobotPose, Alert, Facility, ChatMessage, Position, CatalogTask } from '../types/robot';
 
 // --- State ---
 export interface ChargePath {
@@ -69,6 +69,21 @@ interface FleetState {
   taskCatalog: CatalogTask[];
 }
 
+// Matches the server-side trail length (30s at 500ms ticks)
+const TRAIL_LENGTH = 60;
+
+function applyPoses(robots: Robot[], poses: RobotPose[]): Robot[] {
+  const byId = new Map(poses.map(p => [p[0], p] as const));
+  return robots.map(robot => {
+    const pose = byId.get(robot.id);
+    if (!pose) return robot;
+    const [, x, y, heading, speed, status, battery] = pose;
+    const trail = [...robot.trail, robot.position];
+    if (trail.length > TRAIL_LENGTH) trail.splice(0, trail.length - TRAIL_LENGTH);
+    return { ...robot, position: { x, y }, heading, speed, status, battery, trail };
+  });
+}
+
 const initialState: FleetState = {
   robots: [],
   alerts: [],
@@ -104,6 +119,7 @@ const initialState: FleetState = {
 // --- Actions ---
 type Action =
   | { type: 'SET_ROBOTS'; robots: Robot[] }
+  | { type: 'APPLY_POSES'; poses: RobotPose[] }
   | { type: 'SET_ALERTS'; alerts: Alert[] }
   | { type: 'SET_FACILITY'; facility: Facility }
   | { type: 'SELECT_ROBOT'; robotId: string | null }
@@ -133,6 +149,8 @@ function reducer(state: FleetState, action: Action): FleetState {
   switch (action.type) {
     case 'SET_ROBOTS':
       return { ...state, robots: action.robots };
+    case 'APPLY_POSES':
+      return { ...state, robots: applyPoses(state.robots, action.poses) };
     case 'SET_ALERTS':
       return { ...state, alerts: action.alerts };
     case 'SET_FACILITY':
@@ -1,6 +1,6 @@
 import { useEffect, useRef, useCallback } from 'react';
 import { useFleet } from '../context/FleetContext';
-import type { FleetUpdate } from '../types/robot';
+import type { FleetUpdate, PoseUpdate } from '../types/robot';
 
 export function useWebSocket() {
   const { dispatch } = useFleet();
@@ -21,7 +21,12 @@ export function useWebSocket() {
 
     ws.onmessage = (event) => {
       try {
-        const update: FleetUpdate = JSON.parse(event.data);
+        const update: FleetUpdate | PoseUpdate = JSON.parse(event.data);
+        if (update.type === 'pose') {
+          // Between full snapshots the server only sends robot poses
+          dispatch({ type: 'APPLY_POSES', poses: update.robots });
+          return;
+        }
         dispatch({ type: 'SET_ROBOTS', robots: update.robots });
         dispatch({ type: 'SET_ALERTS', alerts: update.alerts });
       } catch (e) {
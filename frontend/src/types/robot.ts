@@ -6,6 +6,9 @@ export type AlertType = 'deadlock' | 'collision_course' | 'congestion' | 'batter
 export type TaskType = 'pickup' | 'delivery' | 'transport' | 'charging' | string;
 export type TaskStatus = 'in_progress' | 'completed' | 'failed' | 'cancelled';
 export type ErrorSeverityLevel = 'critical' | 'warning' | 'info';
+// Backend ActivityType IntEnum codes: 1=task_started, 2=task_completed, 3=task_cancelled,
+// 4=charging_start, 5=charging_complete, 6=error, 7=error_resolved, 8=command
+export type ActivityType = 1 | 2 | 3 | 4 | 5 | 6 | 7 | 8;
 
 export interface Position {
   x: number;
@@ -26,7 +29,7 @@ export interface Task {
 export interface ActivityEntry {
   timestamp: string;
   description: string;
-  activity_type: string;
+  activity_type: ActivityType;
 }
 
 export interface ErrorInfo {
@@ -75,11 +78,21 @@ export interface Alert {
 }
 
 export interface FleetUpdate {
+  type: 'full';
   robots: Robot[];
   alerts: Alert[];
   timestamp: string;
 }
 
+// Hot per-tick robot fields, positional: [id, x, y, heading, speed, status, battery]
+export type RobotPose = [string, number, number, number, number, RobotStatus, number];
+
+export interface PoseUpdate {
+  type: 'pose';
+  robots: RobotPose[];
+  timestamp: string;
+}
+
 export interface ChatMessage {
   role: 'user' | 'assistant';
   content: string;